@@ -0,0 +1,114 @@
+from collections import OrderedDict
+from PyQt6.QtCore import QObject, QPoint, Qt, pyqtSignal
+from PyQt6.QtWidgets import QMessageBox
+
+
+# Alerts shown at once; further alerts wait in the queue
+MAX_VISIBLE_ALERTS = 3
+# Offset between stacked alert windows
+ALERT_STACK_OFFSET = 30
+
+
+class Alert:
+    def __init__(self, key, title, text, with_stop):
+        self.key = key
+        self.title = title
+        self.text = text
+        self.with_stop = with_stop
+        self.count = 1
+        self.box = None
+
+    def message(self):
+        if self.count > 1:
+            return f"{self.text}\n\n(triggered {self.count} times)"
+        return self.text
+
+
+class AlertQueue(QObject):
+    """Modeless reminder alerts with deduplication and a cap on visible windows.
+
+    Posting an alert never blocks: it is either shown right away, merged into
+    an alert with the same key, or queued until a visible alert is closed.
+    Closing an alert with audio, by Stop Audio, Escape or the window's close
+    button, emits stop_requested with its key; Minimize leaves it open.
+    """
+
+    stop_requested = pyqtSignal(object)
+    minimize_requested = pyqtSignal()
+
+    def __init__(self, window, max_visible=MAX_VISIBLE_ALERTS):
+        super().__init__(window)
+        self.window = window
+        self.max_visible = max_visible
+        self.visible = OrderedDict()
+        self.queued = OrderedDict()
+
+    def __len__(self):
+        return len(self.visible) + len(self.queued)
+
+    def post(self, key, title, text, with_stop=True, replace=False):
+        """Show an alert, or merge it into a pending alert with the same key.
+
+        With `replace`, a pending alert takes the new text instead of
+        counting another trigger.
+        """
+        alert = self.visible.get(key) or self.queued.get(key)
+        if alert is not None:
+            if replace:
+                alert.text = text
+                alert.count = 1
+                alert.with_stop = alert.with_stop or with_stop
+            else:
+                alert.count += 1
+            if alert.box is not None:
+                alert.box.setText(alert.message())
+            return
+        self.queued[key] = Alert(key, title, text, with_stop)
+        self._show_next()
+
+    def clear(self):
+        """Drop queued and visible alerts without acting on them."""
+        self.queued.clear()
+        for alert in list(self.visible.values()):
+            alert.box.finished.disconnect()
+            alert.box.deleteLater()
+        self.visible.clear()
+
+    def _show_next(self):
+        while self.queued and len(self.visible) < self.max_visible:
+            _, alert = self.queued.popitem(last=False)
+            self.visible[alert.key] = alert
+            self._open(alert)
+
+    def _open(self, alert):
+        box = QMessageBox(self.window)
+        box.setWindowTitle(alert.title)
+        box.setText(alert.message())
+        box.setWindowModality(Qt.WindowModality.NonModal)
+        box.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+
+        # Closing the window or pressing Escape dismisses the alert
+        if alert.with_stop:
+            dismiss_button = box.addButton("Stop Audio", QMessageBox.ButtonRole.ActionRole)
+        else:
+            dismiss_button = box.addButton("Close", QMessageBox.ButtonRole.RejectRole)
+        box.setEscapeButton(dismiss_button)
+        minimize_button = box.addButton("Minimize", QMessageBox.ButtonRole.ActionRole)
+        # Drop the message box's own handler so the alert and its audio stay
+        minimize_button.clicked.disconnect()
+        minimize_button.clicked.connect(self.minimize_requested)
+        box.finished.connect(lambda _: self._closed(alert))
+
+        alert.box = box
+        box.show()
+        # Stack alerts so that they do not hide each other
+        offset = (len(self.visible) - 1) * ALERT_STACK_OFFSET
+        box.move(self.window.frameGeometry().center() - box.rect().center() + QPoint(offset, offset))
+
+    def _closed(self, alert):
+        if self.visible.get(alert.key) is alert:
+            del self.visible[alert.key]
+        alert.box = None
+        if alert.with_stop:
+            self.stop_requested.emit(alert.key)
+        self._show_next()
@@ -1,58 +1,85 @@
 import sys
-import os
-import json
-from functools import partial
+import time
+import argparse
+
+# Taken before the Qt imports so --startup-profile includes their cost
+LAUNCH_TIME = time.perf_counter()
+
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QLabel, QLineEdit, QVBoxLayout, QHBoxLayout,
     QDateTimeEdit, QSpinBox, QRadioButton, QButtonGroup, QPushButton, QFileDialog,
-    QTableWidget, QTableWidgetItem, QStatusBar, QMessageBox, QCheckBox, QGridLayout, QHeaderView
+    QTableView, QStatusBar, QMessageBox, QCheckBox, QGridLayout, QHeaderView, QComboBox
 )
-from PyQt6.QtCore import QDateTime, QTimer, Qt
-from PyQt6.QtGui import QIcon
-import pygame
+from PyQt6.QtCore import QDateTime, QTimer
+from engine import ReminderEngine, alert_token, preview_token, CATCH_UP_TOKEN
+from remote import RemoteEngine, SERVER_NAME
+from catchup import CATCH_UP_POLICIES, DEFAULT_CATCH_UP_POLICY
+from reminder import Reminder
+from recurrence import DAILY, WEEKLY, MONTHLY, days_to_mask
+from alerts import AlertQueue
+from models import (
+    ReminderTableModel, HistoryTableModel, TimelineTableModel, ButtonDelegate, PLAY_COLUMN, DELETE_COLUMN, BUTTON_SIZE,
+)
+import metrics
+
+
+# Ranges offered for the upcoming announcements table, in days
+UPCOMING_RANGES = [("Next 24 hours", 1), ("Next 7 days", 7), ("Next 30 days", 30)]
+
+# Milliseconds between removals of announcements that have started from the upcoming table
+UPCOMING_CLOCK_INTERVAL = 60 * 1000
 
 
 class TaskScheduler(QMainWindow):
-    def __init__(self):
+    def __init__(self, engine):
         super().__init__()
         self.setWindowTitle("AMZ Announcement")
         self.setGeometry(100, 100, 800, 600)
 
-        # Initialize pygame for audio playback
-        pygame.mixer.init()
-
-        # Load reminders from JSON file
-        self.reminders_file = "reminders.json"
-        self.reminders = self.load_reminders()
+        # The engine schedules, stores and plays reminders, either in this
+        # process or in the background service the window is attached to
+        self.engine = engine
+        self.store = engine.store
+        self.remote = isinstance(engine, RemoteEngine)
+        engine.reminder_fired.connect(self.show_reminder_popup)
+        engine.missed_reminders.connect(self.show_missed_reminders)
+        engine.audio_started.connect(self.on_audio_started)
+        engine.audio_finished.connect(self.on_audio_finished)
+        engine.audio_failed.connect(self.on_audio_failed)
+        engine.import_finished.connect(self.on_import_finished)
+        if self.remote:
+            engine.disconnected.connect(self.on_engine_disconnected)
+        else:
+            engine.reload_failed.connect(lambda message: self.status_bar.showMessage(message, 5000))
 
         # UI setup
         self.init_ui()
 
-        # Timer to check reminders every second
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.check_reminders)
-        self.timer.start(1000)  # Check every 1 second
-
-        # Timer to check if audio has finished playing
-        self.audio_check_timer = QTimer()
-        self.audio_check_timer.timeout.connect(self.check_audio_finished)
-        self.audio_check_timer.start(500)  # Check every 500ms
+        # Modeless alerts so firing never waits on the user
+        self.alerts = AlertQueue(self)
+        # Alerts are keyed by the token of their audio, so Stop Audio stops only that
+        self.alerts.stop_requested.connect(self.stop_alert_audio)
+        self.alerts.minimize_requested.connect(self.minimize_app)
 
         # Attributes to track audio playback
         self.currently_playing_reminder = None
-        self.currently_playing_button = None
-        self.audio_looping = False
 
     def closeEvent(self, event):
         """Override close event to show confirmation dialog."""
+        if self.remote:
+            note = "Reminders keep running in the background service."
+        else:
+            note = "Note: If closed, reminders will not function."
         reply = QMessageBox.question(
             self,
             "Exit Confirmation",
-            "Are you sure you want to exit the application?\n\nNote: If closed, reminders will not function.",
+            f"Are you sure you want to exit the application?\n\n{note}",
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
             QMessageBox.StandardButton.No,
         )
         if reply == QMessageBox.StandardButton.Yes:
+            self.alerts.clear()
+            self.engine.close()
             event.accept()
         else:
             event.ignore()
@@ -105,6 +132,17 @@ class TaskScheduler(QMainWindow):
 
         form_layout.addLayout(recurrence_layout)
 
+        # Handling of occurrences missed while the app was not running
+        catch_up_layout = QHBoxLayout()
+        catch_up_layout.addWidget(QLabel("If missed:"))
+        self.catch_up_combo = QComboBox()
+        for policy, label in CATCH_UP_POLICIES.items():
+            self.catch_up_combo.addItem(label, policy)
+        self.catch_up_combo.setCurrentIndex(self.catch_up_combo.findData(DEFAULT_CATCH_UP_POLICY))
+        catch_up_layout.addWidget(self.catch_up_combo)
+        catch_up_layout.addStretch()
+        form_layout.addLayout(catch_up_layout)
+
         # Weekly Recurrence Settings
         self.weekly_settings_layout = QGridLayout()
         self.weekly_settings_layout.addWidget(QLabel("Recur every:"), 0, 0)
@@ -150,55 +188,113 @@ class TaskScheduler(QMainWindow):
         self.add_button.clicked.connect(self.add_reminder)
         form_layout.addWidget(self.add_button)
 
+        # Bulk import and export of schedules
+        schedule_layout = QHBoxLayout()
+        self.import_button = QPushButton("Import Schedule...")
+        self.import_button.clicked.connect(self.import_schedule)
+        schedule_layout.addWidget(self.import_button)
+        self.export_button = QPushButton("Export Schedule...")
+        self.export_button.clicked.connect(self.export_schedule)
+        schedule_layout.addWidget(self.export_button)
+        form_layout.addLayout(schedule_layout)
+
         main_layout.addLayout(form_layout)
 
         # Active Task Table
-        self.active_table = QTableWidget()
-        self.active_table.setColumnCount(5)
-        self.active_table.setHorizontalHeaderLabels(["Task Name", "Start Time", "Recurrence", "", ""])
+        self.active_model = ReminderTableModel(self.store, True, self)
+        self.active_table = QTableView()
+        self.active_table.setModel(self.active_model)
         self.setup_table(self.active_table)
         main_layout.addWidget(self.active_table)
 
         # Inactive Task Table
         self.inactive_button = QPushButton("Show Inactive Tasks")
         self.inactive_button.clicked.connect(self.toggle_inactive_tasks)
-        self.inactive_table = QTableWidget()
-        self.inactive_table.setColumnCount(5)
-        self.inactive_table.setHorizontalHeaderLabels(["Task Name", "Start Time", "Recurrence", "", ""])
+        # Archived reminders are paged in from the history once the table is first shown
+        self.inactive_model = None
+        self.inactive_table = QTableView()
         self.setup_table(self.inactive_table)
         self.inactive_table.setVisible(False)
         main_layout.addWidget(self.inactive_button)
         main_layout.addWidget(self.inactive_table)
 
+        # Upcoming announcements, generated from the recurrences once first shown
+        upcoming_layout = QHBoxLayout()
+        self.upcoming_button = QPushButton("Show Upcoming Announcements")
+        self.upcoming_button.clicked.connect(self.toggle_upcoming)
+        upcoming_layout.addWidget(self.upcoming_button)
+        self.upcoming_range = QComboBox()
+        for label, days in UPCOMING_RANGES:
+            self.upcoming_range.addItem(label, days)
+        self.upcoming_range.currentIndexChanged.connect(self.on_upcoming_range_changed)
+        upcoming_layout.addWidget(self.upcoming_range)
+        self.upcoming_model = None
+        self.upcoming_table = QTableView()
+        header = self.upcoming_table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.upcoming_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.upcoming_table.setVisible(False)
+        main_layout.addLayout(upcoming_layout)
+        main_layout.addWidget(self.upcoming_table)
+
         # Status Bar
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
 
+        # Permanent warning about reminders whose audio cannot be played
+        self.audio_warning = QLabel()
+        self.audio_warning.setStyleSheet("color: red")
+        self.audio_warning.setVisible(False)
+        self.status_bar.addPermanentWidget(self.audio_warning)
+        self.active_model.set_validator(self.engine.validator)
+        self.audio_warning_timer = QTimer(self)
+        self.audio_warning_timer.setSingleShot(True)
+        self.audio_warning_timer.timeout.connect(self.update_audio_warning)
+        for signal in (
+            self.engine.validator.results_changed, self.store.reminder_added,
+            self.store.reminder_removed, self.store.reminders_removed, self.store.reminders_reset,
+        ):
+            signal.connect(lambda *_: self.audio_warning_timer.start())
+
+        # The upcoming table is regenerated once per batch of changes while shown
+        self.upcoming_timer = QTimer(self)
+        self.upcoming_timer.setSingleShot(True)
+        self.upcoming_timer.timeout.connect(self.refresh_upcoming)
+        for signal in (
+            self.engine.validator.results_changed, self.store.reminder_added, self.store.reminder_removed,
+            self.store.reminders_removed, self.store.reminder_changed, self.store.reminders_reset,
+        ):
+            signal.connect(lambda *_: self.upcoming_timer.start())
+        self.upcoming_clock = QTimer(self)
+        self.upcoming_clock.setInterval(UPCOMING_CLOCK_INTERVAL)
+        self.upcoming_clock.timeout.connect(lambda: self.upcoming_model.drop_past())
+
         # Connect radio buttons to toggle recurrence options
         self.recurrence_group.buttonClicked.connect(self.update_recurrence_options)
 
-        # Refresh table on startup
-        self.refresh_tables()
-
     def setup_table(self, table):
         """Set up table properties for consistent UI/UX."""
         header = table.horizontalHeader()
         # Set resize modes for columns
         header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)  # Task Name
-        header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)  # Start Time
+        header.setSectionResizeMode(1, QHeaderView.ResizeMode.Fixed)  # Start Time
         header.setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)  # Recurrence
-        header.setSectionResizeMode(3, QHeaderView.ResizeMode.Fixed)  # Play Button
-        header.setSectionResizeMode(4, QHeaderView.ResizeMode.Fixed)  # Delete Button
-
-        # Set fixed widths for play and delete columns
-        table.setColumnWidth(3, 40)
-        table.setColumnWidth(4, 40)
-
-        # Align headers to center
-        for i in range(table.columnCount()):
-            item = table.horizontalHeaderItem(i)
-            if item:
-                item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+        header.setSectionResizeMode(PLAY_COLUMN, QHeaderView.ResizeMode.Fixed)  # Play Button
+        header.setSectionResizeMode(DELETE_COLUMN, QHeaderView.ResizeMode.Fixed)  # Delete Button
+
+        # Fixed sizes avoid measuring every row, which matters for large tables
+        table.setColumnWidth(1, table.fontMetrics().horizontalAdvance("00/00/0000 00:00:00") + 20)
+        table.setColumnWidth(PLAY_COLUMN, 40)
+        table.setColumnWidth(DELETE_COLUMN, 40)
+        rows = table.verticalHeader()
+        rows.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        rows.setDefaultSectionSize(BUTTON_SIZE + 4)
+
+        # Play and delete buttons are painted by a delegate
+        delegate = ButtonDelegate(table)
+        delegate.clicked.connect(self.on_table_button_clicked)
+        table.setItemDelegateForColumn(PLAY_COLUMN, delegate)
+        table.setItemDelegateForColumn(DELETE_COLUMN, delegate)
 
     def update_recurrence_options(self):
         """Update recurrence options visibility based on selected type."""
@@ -227,38 +323,92 @@ class TaskScheduler(QMainWindow):
             self.status_bar.showMessage("Task name and audio file are required!", 5000)
             return
 
-        if self.one_time_radio.isChecked():
-            recurrence = {"type": "one_time"}
-        elif self.daily_radio.isChecked():
-            recurrence = {"type": "daily"}
+        reminder = Reminder(task_name, start_time, audio_file, catch_up=self.catch_up_combo.currentData())
+        if self.daily_radio.isChecked():
+            reminder.recurrence = DAILY
         elif self.weekly_radio.isChecked():
-            recurrence = {
-                "type": "weekly",
-                "interval": self.weekly_interval_spinbox.value(),
-                "days": [day for day, checkbox in self.days_checkboxes.items() if checkbox.isChecked()],
-            }
+            reminder.recurrence = WEEKLY
+            reminder.interval = self.weekly_interval_spinbox.value()
+            reminder.day_mask = days_to_mask(day for day, checkbox in self.days_checkboxes.items() if checkbox.isChecked())
         elif self.monthly_radio.isChecked():
-            recurrence = {"type": "monthly"}
-        else:
-            recurrence = {"type": "one_time"}  # Default
-
-        reminder = {
-            "task_name": task_name,
-            "start_time": start_time,
-            "recurrence": recurrence,
-            "audio_file": audio_file,
-            "active": True,
-        }
-        self.reminders.append(reminder)
-        self.save_reminders()
-        self.refresh_tables()
+            reminder.recurrence = MONTHLY
+        self.engine.add_reminder(reminder)
         self.clear_inputs()
 
+    def import_schedule(self):
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "Import Schedule", "", "Schedules (*.csv *.ics);;CSV Files (*.csv);;iCalendar Files (*.ics)"
+        )
+        if file_path:
+            self.status_bar.showMessage(f"Importing {file_path}...")
+            self.engine.import_file(file_path)
+
+    def on_import_finished(self, file_path, count, errors):
+        if not errors:
+            self.status_bar.showMessage(f"Imported {count} reminder(s) from {file_path}.", 5000)
+            return
+        self.status_bar.clearMessage()
+        lines = [f"Line {line}: {message}" if line else message for line, message in errors]
+        QMessageBox.warning(
+            self, "Import Failed",
+            f"Nothing was imported from {file_path}:\n\n" + "\n".join(lines),
+        )
+
+    def export_schedule(self):
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Export Schedule", "schedule.csv", "CSV Files (*.csv);;iCalendar Files (*.ics)"
+        )
+        if not file_path:
+            return
+        try:
+            count = self.engine.export_file(file_path)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Export Failed", str(e))
+            return
+        self.status_bar.showMessage(f"Exported {count} reminder(s) to {file_path}.", 5000)
+
+    def update_audio_warning(self):
+        """Show how many reminders will fail to play their audio."""
+        broken = len(self.engine.validator.broken())
+        self.audio_warning.setText(f"{broken} reminder(s) have missing or unreadable audio")
+        self.audio_warning.setVisible(broken > 0)
+
     def toggle_inactive_tasks(self):
         is_visible = self.inactive_table.isVisible()
+        if self.inactive_model is None:
+            self.inactive_model = HistoryTableModel(self.engine.history, self)
+            self.inactive_model.set_playing(self.currently_playing_reminder)
+            self.inactive_table.setModel(self.inactive_model)
         self.inactive_table.setVisible(not is_visible)
         self.inactive_button.setText("Hide Inactive Tasks" if not is_visible else "Show Inactive Tasks")
 
+    def toggle_upcoming(self):
+        is_visible = self.upcoming_table.isVisible()
+        if self.upcoming_model is None:
+            self.upcoming_model = TimelineTableModel(
+                self.store, self.engine.validator, self.upcoming_range.currentData(), self,
+            )
+            self.upcoming_table.setModel(self.upcoming_model)
+        elif not is_visible:
+            # Changes were not followed while the table was hidden
+            self.upcoming_model.refresh()
+        self.upcoming_table.setVisible(not is_visible)
+        if is_visible:
+            self.upcoming_clock.stop()
+        else:
+            self.upcoming_clock.start()
+        self.upcoming_button.setText(
+            "Hide Upcoming Announcements" if not is_visible else "Show Upcoming Announcements"
+        )
+
+    def on_upcoming_range_changed(self):
+        if self.upcoming_model is not None:
+            self.upcoming_model.set_days(self.upcoming_range.currentData())
+
+    def refresh_upcoming(self):
+        if self.upcoming_model is not None and self.upcoming_table.isVisible():
+            self.upcoming_model.refresh()
+
     def clear_inputs(self):
         self.task_name_edit.clear()
         self.start_datetime.setDateTime(QDateTime.currentDateTime())
@@ -267,187 +417,63 @@ class TaskScheduler(QMainWindow):
             checkbox.setChecked(False)
         self.audio_path_edit.clear()
         self.one_time_radio.setChecked(True)
-
-    def check_reminders(self):
-        current_time = QDateTime.currentDateTime().toSecsSinceEpoch()
-        for reminder in self.reminders:
-            if reminder["active"] and reminder["start_time"] <= current_time:
-                self.play_audio(reminder["audio_file"], loop=True)
-                self.show_reminder_popup(reminder)
-
-                # Handle recurrence
-                recurrence = reminder.get("recurrence", {"type": "one_time"})
-                rec_type = recurrence.get("type", "one_time")
-
-                if rec_type == "one_time":
-                    reminder["active"] = False  # Mark reminder as inactive
-                elif rec_type == "daily":
-                    # Add 1 day to start_time
-                    reminder["start_time"] += 86400  # seconds in a day
-                elif rec_type == "weekly":
-                    interval = recurrence.get("interval", 1)
-                    days = recurrence.get("days", [])
-                    next_time = self.compute_next_weekly_occurrence(reminder["start_time"], interval, days)
-                    if next_time:
-                        reminder["start_time"] = next_time
-                    else:
-                        reminder["active"] = False  # No more occurrences
-                elif rec_type == "monthly":
-                    # Add 1 month to start_time
-                    reminder["start_time"] = self.add_months(reminder["start_time"], 1)
-                else:
-                    reminder["active"] = False  # Default to one-time
-
-        self.save_reminders()
-        self.refresh_tables()
-
-    def compute_next_weekly_occurrence(self, last_time, interval, days):
-        """Compute the next occurrence time for a weekly recurring reminder."""
-        day_numbers = {
-            "Monday": 1,
-            "Tuesday": 2,
-            "Wednesday": 3,
-            "Thursday": 4,
-            "Friday": 5,
-            "Saturday": 6,
-            "Sunday": 7,
-        }
-        day_indices = [day_numbers[day] for day in days]
-        if not day_indices:
-            return None  # No days selected
-
-        next_datetime = QDateTime.fromSecsSinceEpoch(last_time).addDays(1)
-        weeks_added = 0
-
-        while weeks_added < 52:  # Limit to prevent infinite loops
-            day_of_week = next_datetime.date().dayOfWeek()
-            if day_of_week in day_indices:
-                weeks_since_start = (next_datetime.date().toJulianDay() - QDateTime.fromSecsSinceEpoch(last_time).date().toJulianDay()) // 7
-                if weeks_since_start % interval == 0:
-                    if next_datetime.toSecsSinceEpoch() > last_time:
-                        return next_datetime.toSecsSinceEpoch()
-            next_datetime = next_datetime.addDays(1)
-            if next_datetime.date().dayOfWeek() == 1:  # Monday
-                weeks_added += 1
-        return None
-
-    def add_months(self, start_time, months):
-        """Add months to a timestamp."""
-        start_datetime = QDateTime.fromSecsSinceEpoch(start_time)
-        month = start_datetime.date().month() + months
-        year = start_datetime.date().year() + (month - 1) // 12
-        month = (month - 1) % 12 + 1
-        day = min(start_datetime.date().day(), QDateTime(year, month, 1, 0, 0).date().daysInMonth())
-        new_date = QDateTime(year, month, day, start_datetime.time().hour(), start_datetime.time().minute(), start_datetime.time().second())
-        return new_date.toSecsSinceEpoch()
-
-    def play_audio(self, audio_file, loop=False):
-        """Play the reminder's audio file."""
-        if not os.path.exists(audio_file):
-            self.status_bar.showMessage(f"Audio file not found: {audio_file}", 5000)
-            return
-        try:
-            pygame.mixer.music.load(audio_file)
-            pygame.mixer.music.play(-1 if loop else 0)  # Loop indefinitely or play once
-            self.audio_looping = loop
-            self.status_bar.showMessage(f"Playing reminder audio: {audio_file}", 5000)
-        except Exception as e:
-            self.status_bar.showMessage(f"Error playing audio: {e}", 5000)
+        self.catch_up_combo.setCurrentIndex(self.catch_up_combo.findData(DEFAULT_CATCH_UP_POLICY))
 
     def stop_audio(self):
-        """Stop the currently playing audio."""
-        pygame.mixer.music.stop()
+        """Stop the audio played from a table."""
+        if self.currently_playing_reminder is not None:
+            self.engine.stop_audio(preview_token(self.currently_playing_reminder))
         self.status_bar.showMessage("Audio playback stopped.", 5000)
-        if self.currently_playing_button is not None:
-            try:
-                self.currently_playing_button.setIcon(QIcon('play_icon.png'))
-            except RuntimeError:
-                # The button has been deleted
-                pass
-            self.currently_playing_reminder = None
-            self.currently_playing_button = None
-
-    def check_audio_finished(self):
-        """Check if the audio has finished playing."""
-        if not pygame.mixer.music.get_busy():
-            # Music has stopped playing
-            if not self.audio_looping:
-                if self.currently_playing_button is not None:
-                    try:
-                        self.currently_playing_button.setIcon(QIcon('play_icon.png'))
-                    except RuntimeError:
-                        # The button has been deleted
-                        pass
-                    self.currently_playing_reminder = None
-                    self.currently_playing_button = None
-
-    def refresh_tables(self):
-        self.active_table.setRowCount(0)
-        self.inactive_table.setRowCount(0)
-
-        for reminder in self.reminders:
-            table = self.active_table if reminder["active"] else self.inactive_table
-            row_position = table.rowCount()
-            table.insertRow(row_position)
-
-            # Create play button with icon
-            play_button = QPushButton()
-            play_button.setIcon(QIcon.fromTheme('media-playback-start'))
-            play_button.clicked.connect(partial(self.toggle_audio, reminder, play_button))
-            play_button.setFixedSize(30, 30)
-
-            # Create delete button with icon
-            delete_button = QPushButton()
-            delete_button.setIcon(QIcon.fromTheme('edit-delete'))
-            delete_button.clicked.connect(partial(self.delete_reminder, reminder))
-            delete_button.setFixedSize(30, 30)
-
-            table.setItem(row_position, 0, QTableWidgetItem(reminder["task_name"]))
-            table.setItem(row_position, 1, QTableWidgetItem(QDateTime.fromSecsSinceEpoch(reminder["start_time"]).toString("dd/MM/yyyy hh:mm:ss")))
-            recurrence_str = self.format_recurrence(reminder["recurrence"])
-            table.setItem(row_position, 2, QTableWidgetItem(recurrence_str))
-            table.setCellWidget(row_position, 3, play_button)
-            table.setCellWidget(row_position, 4, delete_button)
-
-            # Center-align cells
-            for col in range(5):
-                item = table.item(row_position, col)
-                if item:
-                    item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-
-        # Remove headers for play and delete columns
-        for table in [self.active_table, self.inactive_table]:
-            table.setHorizontalHeaderLabels(["Task Name", "Start Time", "Recurrence", "", ""])
-
-    def format_recurrence(self, recurrence):
-        """Format the recurrence information for display."""
-        rec_type = recurrence.get("type", "one_time")
-        if rec_type == "one_time":
-            return "One time"
-        elif rec_type == "daily":
-            return "Daily"
-        elif rec_type == "weekly":
-            interval = recurrence.get("interval", 1)
-            days = recurrence.get("days", [])
-            days_str = ', '.join(days)
-            return f"Weekly, every {interval} week(s) on {days_str}"
-        elif rec_type == "monthly":
-            return "Monthly"
-        else:
-            return "One time"
+        self.set_playing_reminder(None)
 
-    def toggle_audio(self, reminder, button):
-        if self.currently_playing_reminder == reminder:
-            # Audio is playing, stop it
-            self.stop_audio()
+    def stop_all_audio(self):
+        """Stop every playback, announcements included."""
+        self.engine.stop_audio()
+        self.status_bar.showMessage("Audio playback stopped.", 5000)
+        self.set_playing_reminder(None)
+
+    def stop_alert_audio(self, token):
+        """Stop the audio of one alert, leaving other announcements playing."""
+        self.engine.stop_audio(token)
+        self.status_bar.showMessage("Audio playback stopped.", 5000)
+
+    def on_audio_started(self, token, audio_file):
+        self.status_bar.showMessage(f"Playing reminder audio: {audio_file}", 5000)
+
+    def on_audio_finished(self, token):
+        """Reset the play icon once a table preview has played to the end."""
+        if self.currently_playing_reminder is not None and token == preview_token(self.currently_playing_reminder):
+            self.set_playing_reminder(None)
+
+    def on_audio_failed(self, token, audio_file, message):
+        self.status_bar.showMessage(message, 5000)
+        self.on_audio_finished(token)
+
+    def set_playing_reminder(self, reminder):
+        """Track the reminder played from a table and update its play icon."""
+        self.currently_playing_reminder = reminder
+        self.active_model.set_playing(reminder)
+        if self.inactive_model is not None:
+            self.inactive_model.set_playing(reminder)
+
+    def on_table_button_clicked(self, index):
+        """Dispatch a click on a play or delete button painted in a table."""
+        reminder = index.model().reminder(index.row())
+        if index.column() == PLAY_COLUMN:
+            self.toggle_audio(reminder)
+        elif index.column() == DELETE_COLUMN:
+            self.delete_reminder(reminder)
+
+    def toggle_audio(self, reminder):
+        if self.currently_playing_reminder is reminder:
+            # Audio is playing; stop it along with any announcement
+            self.stop_all_audio()
         else:
-            # Stop any currently playing audio
+            # Stop the audio previewed from the table before
             self.stop_audio()
             # Play the new audio
-            self.play_audio(reminder['audio_file'], loop=False)
-            self.currently_playing_reminder = reminder
-            self.currently_playing_button = button
-            button.setIcon(QIcon.fromTheme('media-playback-stop'))
+            self.engine.play_preview(reminder)
+            self.set_playing_reminder(reminder)
 
     def delete_reminder(self, reminder):
         """Delete a reminder."""
@@ -459,43 +485,80 @@ class TaskScheduler(QMainWindow):
             QMessageBox.StandardButton.No,
         )
         if reply == QMessageBox.StandardButton.Yes:
-            if self.currently_playing_reminder == reminder:
+            if self.currently_playing_reminder is reminder:
                 self.stop_audio()
-            self.reminders.remove(reminder)
-            self.save_reminders()
-            self.refresh_tables()
+            self.engine.delete_reminder(reminder)
 
     def show_reminder_popup(self, reminder):
-        """Display popup for reminder."""
-        msg_box = QMessageBox(self)
-        msg_box.setWindowTitle("Reminder Alert")
-        msg_box.setText(f"Task: {reminder['task_name']}")
+        """Queue a non-blocking alert for a reminder."""
+        self.alerts.post(alert_token(reminder), "Reminder Alert", f"Task: {reminder.task_name}")
 
-        stop_button = msg_box.addButton("Stop Audio", QMessageBox.ButtonRole.ActionRole)
-        minimize_button = msg_box.addButton("Minimize", QMessageBox.ButtonRole.ActionRole)
+    def show_missed_reminders(self, text, with_stop):
+        """Show the single summary of reminders missed during downtime."""
+        self.status_bar.showMessage("Missed reminders caught up.", 5000)
+        # A later catch-up replaces the summary still open, along with its audio
+        self.alerts.post(CATCH_UP_TOKEN, "Missed Reminders", text, with_stop=with_stop, replace=True)
 
-        stop_button.clicked.connect(self.stop_audio)
-        minimize_button.clicked.connect(self.minimize_app)
-
-        msg_box.exec()
+    def on_engine_disconnected(self):
+        self.status_bar.showMessage("Lost connection to the reminder service.")
 
     def minimize_app(self):
         """Minimize application."""
         self.showMinimized()
 
-    def load_reminders(self):
-        if os.path.exists(self.reminders_file):
-            with open(self.reminders_file, "r") as f:
-                return json.load(f)
-        return []
-
-    def save_reminders(self):
-        with open(self.reminders_file, "w") as f:
-            json.dump(self.reminders, f, indent=4)
-
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    window = TaskScheduler()
+    parser = argparse.ArgumentParser(description="AMZ Announcement")
+    parser.add_argument(
+        "--reminders", default="reminders.json",
+        help="reminders file; a .db or .sqlite file uses the SQLite store",
+    )
+    parser.add_argument(
+        "--connect", nargs="?", const=SERVER_NAME, metavar="NAME",
+        help="attach to a running background service instead of scheduling in this window",
+    )
+    parser.add_argument(
+        "--startup-profile", action="store_true",
+        help="print how long each phase of startup took",
+    )
+    parser.add_argument(
+        "--history-days", type=int, metavar="DAYS",
+        help="delete archived reminders after this many days (default: keep them)",
+    )
+    parser.add_argument(
+        "--audio-cache", metavar="DIR",
+        help="folder for decoded audio kept between runs; an empty value disables it",
+    )
+    metrics.add_arguments(parser)
+    args, qt_args = parser.parse_known_args()
+
+    startup = metrics.StartupProfile(LAUNCH_TIME)
+    startup.mark("imports")
+    app = QApplication(sys.argv[:1] + qt_args)
+    startup.mark("QApplication")
+    metrics_writer = metrics.setup(args, app)
+    if metrics_writer is not None:
+        app.aboutToQuit.connect(metrics_writer.write)
+    if args.connect:
+        engine = RemoteEngine(args.connect)
+        if not engine.connect_to_daemon():
+            QMessageBox.critical(None, "AMZ Announcement", f"Cannot reach the reminder service '{args.connect}'.")
+            sys.exit(1)
+    else:
+        engine = ReminderEngine(args.reminders, retention_days=args.history_days, pcm_cache_dir=args.audio_cache)
+    startup.mark("engine")
+    window = TaskScheduler(engine)
+    startup.mark("window")
+
+    # Paint the window before loading reminders so it appears right away
     window.show()
+    app.processEvents()
+    startup.mark("window shown")
+    engine.start()
+    startup.mark("reminders loaded")
+    if args.startup_profile:
+        def report_startup():
+            startup.mark("first event loop pass")
+            print(startup.report(), file=sys.stderr)
+        QTimer.singleShot(0, report_startup)
     sys.exit(app.exec())
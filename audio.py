@@ -0,0 +1,430 @@
+import os
+import sys
+import json
+import mmap
+import queue
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from PyQt6.QtCore import QObject, pyqtSignal
+from metrics import FIRING_LATENCY
+
+# Imported on the audio thread when it is first needed, since importing
+# pygame and opening the audio device noticeably slow down startup
+pygame = None
+
+
+def import_pygame():
+    global pygame
+    if pygame is None:
+        import pygame
+    return pygame
+
+
+# Memory budget for decoded sounds kept in the cache
+DEFAULT_AUDIO_CACHE_BUDGET = 64 * 1024 * 1024
+
+# Disk budget for decoded audio kept between runs
+DEFAULT_PCM_CACHE_BUDGET = 512 * 1024 * 1024
+
+
+def default_pcm_cache_dir():
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "amz-announcement", "pcm")
+
+
+class PcmCache:
+    """Decoded audio kept on disk as raw PCM in the mixer's format.
+
+    Each source file is decoded once; later loads, including after a restart,
+    map the PCM file into memory instead of decoding again. Entries are named
+    by a hash of the source's content, so the same chime under many paths is
+    stored once. An index maps source paths to hashes and is trusted while
+    the source's size and modification time are unchanged. Entries that have
+    not been used for the longest time are deleted when the directory grows
+    past its budget.
+
+    Used only from the audio thread, with the mixer initialised.
+    """
+
+    INDEX_FILE = "index.json"
+
+    def __init__(self, directory, budget=DEFAULT_PCM_CACHE_BUDGET):
+        self.directory = directory
+        self.budget = budget
+        os.makedirs(directory, exist_ok=True)
+        self.index_path = os.path.join(directory, self.INDEX_FILE)
+        try:
+            with open(self.index_path, "r") as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+        self.size = sum(entry.stat().st_size for entry in os.scandir(directory) if entry.name.endswith(".pcm"))
+
+    def load(self, path):
+        """Return a Sound for a source file, decoding and storing it on a miss."""
+        stat = os.stat(path)
+        digest = self._digest(path, stat)
+        frequency, sample_format, channels = pygame.mixer.get_init()
+        pcm_path = os.path.join(self.directory, f"{digest}-{frequency}-{sample_format}-{channels}.pcm")
+        frame_size = channels * (abs(sample_format) // 8)
+        try:
+            with open(pcm_path, "rb") as f:
+                if os.fstat(f.fileno()).st_size % frame_size == 0:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                        sound = pygame.mixer.Sound(buffer=data)
+                    # The modification time records when the entry was last used
+                    os.utime(pcm_path)
+                    return sound
+        except (OSError, ValueError):
+            pass
+
+        sound = pygame.mixer.Sound(path)
+        self._store(pcm_path, sound.get_raw())
+        return sound
+
+    def _digest(self, path, stat):
+        real_path = os.path.realpath(path)
+        entry = self.index.get(real_path)
+        if entry is not None and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry["hash"]
+        content_hash = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                content_hash.update(chunk)
+        digest = content_hash.hexdigest()
+        self.index[real_path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": digest}
+        self._write_index()
+        return digest
+
+    def _store(self, pcm_path, data):
+        temporary = pcm_path + ".tmp"
+        try:
+            with open(temporary, "wb") as f:
+                f.write(data)
+            os.replace(temporary, pcm_path)
+        except OSError:
+            # A full or read-only disk only costs decoding again next time
+            return
+        self.size += len(data)
+        self._evict()
+
+    def _evict(self):
+        if self.size <= self.budget:
+            return
+        entries = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.name.endswith(".pcm")),
+            key=lambda entry: entry.stat().st_mtime_ns,
+        )
+        # Keep at least the newest entry even if it exceeds the budget
+        for entry in entries[:-1]:
+            if self.size <= self.budget:
+                break
+            size = entry.stat().st_size
+            try:
+                os.remove(entry.path)
+            except OSError:
+                continue
+            self.size -= size
+
+    def _write_index(self):
+        temporary = self.index_path + ".tmp"
+        try:
+            with open(temporary, "w") as f:
+                json.dump(self.index, f)
+            os.replace(temporary, self.index_path)
+        except OSError:
+            pass
+
+
+class AudioCache:
+    """LRU cache of decoded pygame sounds, bounded by a memory budget.
+
+    Entries are keyed by the real path of the file plus its modification time,
+    so reminders referring to the same file share one decoded buffer and an
+    edited file is decoded again.
+    """
+
+    def __init__(self, budget=DEFAULT_AUDIO_CACHE_BUDGET, disk_cache=None):
+        self.budget = budget
+        self.disk_cache = disk_cache
+        self.size = 0
+        self._sounds = OrderedDict()
+        self._keys = {}
+
+    def __len__(self):
+        return len(self._sounds)
+
+    def __contains__(self, path):
+        try:
+            return self._key(path) in self._sounds
+        except OSError:
+            return False
+
+    def _key(self, path):
+        real_path = os.path.realpath(path)
+        return real_path, os.stat(real_path).st_mtime_ns
+
+    def get(self, path):
+        """Return the decoded sound for a file, loading it on a miss.
+
+        Raises OSError if the file is missing and pygame.error if it cannot be
+        decoded.
+        """
+        key = self._key(path)
+        entry = self._sounds.get(key)
+        if entry is not None:
+            self._sounds.move_to_end(key)
+            return entry[0]
+
+        if self.disk_cache is not None:
+            sound = self.disk_cache.load(key[0])
+        else:
+            sound = pygame.mixer.Sound(key[0])
+        size = self._sound_size(sound)
+
+        # Drop the entry for an older version of the same file
+        stale = self._keys.get(key[0])
+        if stale is not None:
+            self._discard(stale)
+        self._sounds[key] = (sound, size)
+        self._keys[key[0]] = key
+        self.size += size
+        self._evict()
+        return sound
+
+    def prefetch(self, paths):
+        """Decode files ahead of time, skipping ones that cannot be loaded."""
+        loaded = 0
+        for path in set(paths):
+            try:
+                self.get(path)
+                loaded += 1
+            except (OSError, pygame.error):
+                # Reported when the reminder actually plays
+                pass
+        return loaded
+
+    def clear(self):
+        self._sounds.clear()
+        self._keys.clear()
+        self.size = 0
+
+    def _discard(self, key):
+        _, size = self._sounds.pop(key)
+        del self._keys[key[0]]
+        self.size -= size
+
+    def _evict(self):
+        # Keep at least the most recent sound even if it exceeds the budget
+        while self.size > self.budget and len(self._sounds) > 1:
+            self._discard(next(iter(self._sounds)))
+
+    def _sound_size(self, sound):
+        frequency, sample_format, channels = pygame.mixer.get_init()
+        return int(sound.get_length() * frequency) * channels * (abs(sample_format) // 8)
+
+
+# Priorities used when every mixer channel is busy
+PRIORITY_PREVIEW = 0
+PRIORITY_ALERT = 1
+
+# Mixer channels available for overlapping playback
+DEFAULT_MIXER_CHANNELS = 8
+
+# Slack after a sound's nominal length before it is checked for completion
+COMPLETION_SLACK = 0.05
+
+
+class Playback:
+    def __init__(self, token, path, sound, channel, loop, priority):
+        self.token = token
+        self.path = path
+        self.sound = sound
+        self.channel = channel
+        self.loop = loop
+        self.priority = priority
+        self.ends_at = None if loop else time.monotonic() + sound.get_length()
+
+    def is_playing(self):
+        return self.channel.get_busy() and self.channel.get_sound() is self.sound
+
+
+class AudioPlayer(QObject):
+    """Plays audio on a worker thread that owns the pygame mixer.
+
+    Commands are queued from the GUI thread and never block it. Each playback
+    is identified by a caller supplied token and runs on its own mixer
+    channel, so overlapping announcements are mixed; when all channels are
+    busy the lowest priority playback is cut off. Completion is reported
+    through signals when a sound's known length has elapsed, so nothing polls
+    the mixer on a fixed interval. The thread and the mixer are only started
+    by the first command; while the audio device cannot be opened, every play
+    is reported through failed and opening it is retried.
+    """
+
+    started = pyqtSignal(object, str)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(object, str, str)
+
+    def __init__(
+        self, parent=None, cache_budget=DEFAULT_AUDIO_CACHE_BUDGET, channels=DEFAULT_MIXER_CHANNELS,
+        pcm_cache_dir=None, pcm_cache_budget=DEFAULT_PCM_CACHE_BUDGET,
+    ):
+        super().__init__(parent)
+        self.cache_budget = cache_budget
+        self.channels = channels
+        # Decoded audio is kept on disk between runs unless pcm_cache_dir is ""
+        self.pcm_cache_dir = default_pcm_cache_dir() if pcm_cache_dir is None else pcm_cache_dir
+        self.pcm_cache_budget = pcm_cache_budget
+        self._commands = queue.Queue()
+        self._thread = None
+
+    def play(self, path, token=None, loop=False, priority=PRIORITY_ALERT, fade_ms=0, due_time=None):
+        """Queue a sound. `due_time` (epoch seconds) records the firing latency."""
+        self._send("play", token, path, loop, priority, fade_ms, due_time)
+
+    def stop(self, token=None, fade_ms=0):
+        """Stop one playback, or every playback when no token is given."""
+        if self._thread is not None:
+            self._send("stop", token, fade_ms)
+
+    def fade(self, token=None, fade_ms=1000):
+        """Fade out one playback, or every playback when no token is given."""
+        self.stop(token, fade_ms)
+
+    def prefetch(self, paths):
+        self._send("prefetch", list(paths))
+
+    def shutdown(self, timeout=2):
+        if self._thread is not None:
+            self._commands.put(("quit",))
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _send(self, *command):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="audio", daemon=True)
+            self._thread.start()
+        self._commands.put(command)
+
+    def _run(self):
+        import_pygame()
+        self._init_mixer()
+        disk_cache = None
+        if self.pcm_cache_dir:
+            try:
+                disk_cache = PcmCache(self.pcm_cache_dir, self.pcm_cache_budget)
+            except OSError:
+                pass  # Decode every file instead
+        self._cache = AudioCache(self.cache_budget, disk_cache)
+        self._playing = {}
+
+        while True:
+            try:
+                command = self._commands.get(timeout=self._next_wakeup())
+            except queue.Empty:
+                command = None
+            if command is not None:
+                if command[0] == "quit":
+                    break
+            # The thread must outlive a failed command or every later one is lost
+            try:
+                if command is not None:
+                    getattr(self, "_do_" + command[0])(*command[1:])
+                self._reap()
+            except Exception as e:
+                if command is not None and command[0] == "play":
+                    self.failed.emit(command[1], command[2], f"Error playing audio: {e}")
+
+        if self._mixer_error is None:
+            pygame.mixer.quit()
+
+    def _init_mixer(self):
+        """Open the audio device, keeping the error in _mixer_error if that fails."""
+        try:
+            pygame.mixer.init()
+            pygame.mixer.set_num_channels(self.channels)
+        except pygame.error as e:
+            self._mixer_error = str(e) or "no audio device"
+            return False
+        self._mixer_error = None
+        return True
+
+    def _next_wakeup(self):
+        deadlines = [playback.ends_at for playback in self._playing.values() if playback.ends_at is not None]
+        if not deadlines:
+            return None
+        return max(0, min(deadlines) - time.monotonic())
+
+    def _reap(self):
+        """Report playbacks that have finished or were cut off."""
+        now = time.monotonic()
+        for token, playback in list(self._playing.items()):
+            if playback.is_playing():
+                if playback.ends_at is not None and playback.ends_at <= now:
+                    # Still draining the mixer buffer; look again shortly
+                    playback.ends_at = now + COMPLETION_SLACK
+                continue
+            del self._playing[token]
+            self.finished.emit(token)
+
+    def _do_play(self, token, path, loop, priority, fade_ms, due_time):
+        # The device may have been busy or missing; try it again on every play
+        if self._mixer_error is not None and not self._init_mixer():
+            self.failed.emit(token, path, f"Audio device unavailable: {self._mixer_error}")
+            return
+        try:
+            sound = self._cache.get(path)
+        except OSError:
+            self.failed.emit(token, path, f"Audio file not found: {path}")
+            return
+        except pygame.error as e:
+            self.failed.emit(token, path, f"Error playing audio: {e}")
+            return
+
+        previous = self._playing.pop(token, None)
+        if previous is not None:
+            previous.channel.stop()
+        channel = pygame.mixer.find_channel() or self._preempt(priority)
+        if channel is None:
+            self.failed.emit(token, path, "No free audio channel")
+            return
+        channel.play(sound, -1 if loop else 0, fade_ms=fade_ms)  # Loop indefinitely or play once
+        if due_time is not None:
+            FIRING_LATENCY.observe(max(0, time.time() - due_time))
+        self._playing[token] = Playback(token, path, sound, channel, loop, priority)
+        self.started.emit(token, path)
+
+    def _preempt(self, priority):
+        """Free the channel of the oldest playback with the lowest priority."""
+        candidates = [playback for playback in self._playing.values() if playback.priority <= priority]
+        if not candidates:
+            return None
+        victim = min(candidates, key=lambda playback: playback.priority)
+        del self._playing[victim.token]
+        victim.channel.stop()
+        self.finished.emit(victim.token)
+        return victim.channel
+
+    def _do_stop(self, token, fade_ms):
+        playbacks = list(self._playing.values()) if token is None else [self._playing.get(token)]
+        for playback in playbacks:
+            if playback is None:
+                continue
+            if fade_ms:
+                # Reported as finished once the fade has run out
+                playback.channel.fadeout(fade_ms)
+                playback.ends_at = time.monotonic() + fade_ms / 1000
+            else:
+                playback.channel.stop()
+
+    def _do_prefetch(self, paths):
+        if self._mixer_error is None:
+            self._cache.prefetch(paths)
@@ -0,0 +1,266 @@
+"""Benchmarks for the scheduler, recurrence math, persistence and tables.
+
+Runs headless under the Qt offscreen platform and the SDL dummy audio
+driver, and writes the results as JSON so runs can be compared:
+
+    python bench.py --sizes 1000 10000 --output bench.json
+"""
+import os
+import sys
+import json
+import time
+import wave
+import random
+import argparse
+import platform
+import tempfile
+import subprocess
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+# Keep stdout for the JSON report
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from PyQt6.QtCore import QDateTime
+from PyQt6.QtWidgets import QApplication, QTableView
+from recurrence import (
+    ONE_TIME, DAILY, WEEKLY, MONTHLY, DAY_NAMES, compute_next_weekly_occurrence, add_months, next_occurrences,
+    days_to_mask,
+)
+from reminder import Reminder
+from timeline import upcoming
+from store import ReminderStore, SqliteReminderStore
+from models import ReminderTableModel
+from engine import ReminderEngine
+
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+# Reminders falling due in a single benchmarked tick
+DUE_PER_TICK = 50
+
+
+def write_chime(path):
+    """Write a short silent WAV file for the synthetic reminders."""
+    with wave.open(path, "w") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(22050)
+        f.writeframes(b"\0\0" * 4410)
+
+
+def make_reminders(count, audio_files, now, seed=0):
+    """Generate a mixed set of active reminders spread over the next year."""
+    rng = random.Random(seed)
+    reminders = []
+    for index in range(count):
+        kind = rng.random()
+        interval, day_mask = 1, 0
+        if kind < 0.3:
+            recurrence = ONE_TIME
+        elif kind < 0.6:
+            recurrence = DAILY
+        elif kind < 0.9:
+            recurrence = WEEKLY
+            interval = rng.randint(1, 4)
+            day_mask = days_to_mask(rng.sample(DAY_NAMES, rng.randint(1, 7)))
+        else:
+            recurrence = MONTHLY
+        reminders.append(Reminder(
+            f"Announcement {index}",
+            now + rng.randint(3600, 365 * 86400),
+            rng.choice(audio_files),
+            recurrence,
+            interval,
+            day_mask,
+        ))
+    return reminders
+
+
+def measure(function, repeat, setup=None):
+    """Run `function` `repeat` times and return per-run durations in seconds."""
+    durations = []
+    for _ in range(repeat):
+        argument = setup() if setup else None
+        start = time.perf_counter()
+        if setup:
+            function(argument)
+        else:
+            function()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+class Benchmarks:
+    def __init__(self, workdir, repeat):
+        self.workdir = workdir
+        self.repeat = repeat
+        self.results = []
+        self.audio_files = []
+        for index in range(5):
+            path = os.path.join(workdir, f"chime{index}.wav")
+            write_chime(path)
+            self.audio_files.append(path)
+
+    def record(self, name, size, durations, operations=1):
+        self.results.append({
+            "name": name,
+            "size": size,
+            "operations": operations,
+            "min": min(durations),
+            "mean": sum(durations) / len(durations),
+            "max": max(durations),
+            "repeat": len(durations),
+        })
+        print(f"{name:<28} {size:>8} {min(durations) * 1000:>12.3f} ms", file=sys.stderr, flush=True)
+
+    def run(self, size):
+        now = QDateTime.currentSecsSinceEpoch()
+        reminders = make_reminders(size, self.audio_files, now, seed=size)
+        self.bench_recurrence(size, reminders)
+        self.bench_json(size, reminders)
+        self.bench_sqlite(size, reminders)
+        self.bench_tables(size, reminders)
+        self.bench_engine(size, reminders)
+
+    def bench_recurrence(self, size, reminders):
+        weekly = [r for r in reminders if r.recurrence == WEEKLY]
+        self.record("next_weekly_occurrence", size, measure(
+            lambda: [compute_next_weekly_occurrence(r.start_time, r.interval, r.day_mask) for r in weekly],
+            self.repeat), len(weekly))
+        self.record("add_months", size, measure(
+            lambda: [add_months(r.start_time, 1) for r in reminders], self.repeat), size)
+        self.record("next_occurrences_batch", size, measure(
+            lambda: next_occurrences(reminders), self.repeat), size)
+        start = QDateTime.currentSecsSinceEpoch()
+        self.record("timeline_next_1000", size, measure(
+            lambda: list(upcoming(reminders, start, limit=1000)), self.repeat), 1000)
+
+    def bench_json(self, size, reminders):
+        path = os.path.join(self.workdir, f"reminders-{size}.json")
+        store = ReminderStore(path)
+        store.reminders = reminders
+
+        def save():
+            store.dirty = True
+            store.flush()
+        self.record("json_save", size, measure(save, self.repeat))
+        self.record("json_load", size, measure(store.load, self.repeat))
+        store.reminders = reminders
+
+    def bench_sqlite(self, size, reminders):
+        path = os.path.join(self.workdir, f"reminders-{size}.db")
+        json_path = os.path.join(self.workdir, f"reminders-{size}.json")
+        store = SqliteReminderStore(path)
+        start = time.perf_counter()
+        store.migrate_json(json_path)
+        self.record("sqlite_migrate", size, [time.perf_counter() - start])
+        self.record("sqlite_load", size, measure(store.load, self.repeat))
+
+        def advance():
+            reminder = store.reminders[0]
+            reminder.start_time += 86400
+            store.update(reminder)
+            store.flush()
+        self.record("sqlite_update_one", size, measure(advance, self.repeat))
+        self.record("sqlite_next_due_10", size, measure(lambda: store.next_due(10), self.repeat))
+        store.close()
+        os.replace(json_path + ".migrated", json_path)
+
+    def bench_tables(self, size, reminders):
+        store = ReminderStore(os.path.join(self.workdir, "unused.json"))
+        store.reminders = reminders
+
+        def build():
+            model = ReminderTableModel(store, True)
+            view = QTableView()
+            view.resize(800, 600)
+            view.setModel(model)
+            view.grab()
+            return model, view
+        self.record("table_build_and_paint", size, measure(build, self.repeat))
+
+        model, view = build()
+
+        def update_row():
+            reminder = reminders[size // 2]
+            reminder.start_time += 86400
+            store.reminder_changed.emit(reminder)
+            view.grab()
+        self.record("table_update_row", size, measure(update_row, self.repeat))
+
+    def bench_engine(self, size, reminders):
+        path = os.path.join(self.workdir, f"engine-{size}.json")
+        with open(path, "w") as f:
+            json.dump([reminder.to_dict() for reminder in reminders], f)
+
+        engines = []
+
+        def startup():
+            # No persistent audio cache, so runs do not depend on earlier ones
+            engine = ReminderEngine(path, pcm_cache_dir="")
+            engine.start()
+            engines.append(engine)
+        self.record("engine_startup", size, measure(startup, self.repeat))
+
+        engine = engines[-1]
+        for other in engines[:-1]:
+            other.close()
+
+        def make_due():
+            # Pull a batch of reminders to the present so one tick fires them
+            current = QDateTime.currentSecsSinceEpoch()
+            batch = engine.store.reminders[:DUE_PER_TICK]
+            for reminder in batch:
+                reminder.active = True
+                reminder.start_time = current
+                engine.scheduler.schedule(reminder)
+            return batch
+
+        def tick(_):
+            engine.scheduler._on_timeout()
+            engine.store.flush()
+        self.record("tick_fire_50", size, measure(tick, self.repeat, setup=make_due), DUE_PER_TICK)
+        engine.close()
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AMZ Announcement benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="reminder counts to test")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement; the minimum is reported")
+    parser.add_argument("--output", help="write JSON results to this file instead of stdout")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv[:1])
+    with tempfile.TemporaryDirectory() as workdir:
+        benchmarks = Benchmarks(workdir, args.repeat)
+        for size in args.sizes:
+            benchmarks.run(size)
+            app.processEvents()
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": int(time.time()),
+        "results": benchmarks.results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+    else:
+        json.dump(report, sys.stdout, indent=4)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+from recurrence import first_occurrence_after
+
+
+# Policies for occurrences missed while the app was closed or the machine slept
+CATCH_UP_FIRE = "fire"  # Play the reminder once and list it in the summary
+CATCH_UP_COALESCE = "coalesce"  # List the reminder in the summary only
+CATCH_UP_SKIP = "skip"  # Drop missed occurrences silently
+CATCH_UP_POLICIES = {
+    CATCH_UP_FIRE: "Fire once",
+    CATCH_UP_COALESCE: "Summarize",
+    CATCH_UP_SKIP: "Skip",
+}
+DEFAULT_CATCH_UP_POLICY = CATCH_UP_COALESCE
+
+# Seconds a reminder may be late before it counts as missed
+CATCH_UP_GRACE = 60
+
+# Longest list of reminders spelled out in a summary
+SUMMARY_LIMIT = 20
+
+
+def is_overdue(reminder, now, grace=CATCH_UP_GRACE):
+    return now - reminder.start_time > grace
+
+
+def catch_up(reminders, now):
+    """Move overdue reminders straight to their first occurrence after `now`.
+
+    Returns a list of (reminder, missed, policy) for every reminder that was
+    behind, where `missed` is the number of occurrences that were skipped.
+    """
+    results = []
+    for reminder in reminders:
+        if not reminder.active or reminder.start_time > now:
+            continue
+        next_time, missed = first_occurrence_after(reminder, now)
+        if next_time is None:
+            reminder.active = False
+        else:
+            reminder.start_time = next_time
+        policy = reminder.catch_up
+        if policy not in CATCH_UP_POLICIES:
+            policy = DEFAULT_CATCH_UP_POLICY
+        results.append((reminder, missed, policy))
+    return results
+
+
+def summarize(results):
+    """Build the text of a single catch-up summary, or None if nothing to report."""
+    lines = []
+    for reminder, missed, policy in results:
+        if policy == CATCH_UP_SKIP:
+            continue
+        lines.append(f"- {reminder.task_name} ({missed} missed)")
+    if not lines:
+        return None
+    if len(lines) > SUMMARY_LIMIT:
+        hidden = len(lines) - SUMMARY_LIMIT
+        lines = lines[:SUMMARY_LIMIT] + [f"... and {hidden} more"]
+    return "Reminders missed while the application was not running:\n\n" + "\n".join(lines)
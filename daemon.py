@@ -0,0 +1,70 @@
+import sys
+import signal
+import socket
+import argparse
+from PyQt6.QtCore import QCoreApplication, QSocketNotifier
+from engine import ReminderEngine
+from remote import ReminderServer, SERVER_NAME
+import metrics
+
+
+def log(message):
+    print(message, flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AMZ Announcement background service")
+    parser.add_argument(
+        "--reminders", default="reminders.json",
+        help="reminders file; a .db or .sqlite file uses the SQLite store",
+    )
+    parser.add_argument("--name", default=SERVER_NAME, help="local socket name windows attach to")
+    parser.add_argument(
+        "--history-days", type=int, metavar="DAYS",
+        help="delete archived reminders after this many days (default: keep them)",
+    )
+    parser.add_argument(
+        "--audio-cache", metavar="DIR",
+        help="folder for decoded audio kept between runs; an empty value disables it",
+    )
+    metrics.add_arguments(parser)
+    args = parser.parse_args()
+
+    app = QCoreApplication(sys.argv[:1])
+    engine = ReminderEngine(args.reminders, retention_days=args.history_days, pcm_cache_dir=args.audio_cache)
+    server = ReminderServer(engine, args.name)
+    writer = metrics.setup(args, app)
+    if writer is not None:
+        app.aboutToQuit.connect(writer.write)
+
+    engine.reminder_fired.connect(lambda reminder: log(f"Reminder: {reminder.task_name}"))
+    engine.missed_reminders.connect(lambda text, _: log(text))
+    engine.audio_failed.connect(lambda token, path, text: log(text))
+    engine.reload_failed.connect(log)
+    server.request_failed.connect(log)
+
+    def report_audio_problems(paths):
+        for path in sorted(paths):
+            error = engine.validator.error(path)
+            if error is not None:
+                log(f"{error}: {path}")
+    engine.validator.results_changed.connect(report_audio_problems)
+
+    # Save and release the audio device on Ctrl+C or a service stop. The
+    # wakeup socket lets signals interrupt the Qt event loop without polling.
+    wakeup_reader, wakeup_writer = socket.socketpair()
+    wakeup_writer.setblocking(False)
+    signal.set_wakeup_fd(wakeup_writer.fileno())
+    notifier = QSocketNotifier(wakeup_reader.fileno(), QSocketNotifier.Type.Read)
+    notifier.activated.connect(lambda: wakeup_reader.recv(64))
+    signal.signal(signal.SIGINT, lambda *_: app.quit())
+    signal.signal(signal.SIGTERM, lambda *_: app.quit())
+    app.aboutToQuit.connect(engine.close)
+
+    engine.start()
+    log(f"Serving {len(engine.store)} reminders from {args.reminders} on '{args.name}'")
+    sys.exit(app.exec())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+from PyQt6.QtCore import QObject, QDateTime, QTimer, pyqtSignal
+from scheduler import ReminderScheduler, DEFAULT_LOOKAHEAD
+from store import open_store, SqliteReminderStore
+from filewatch import ReminderFileWatcher
+from history import HistoryStore, history_path, is_archived
+from validation import AudioValidator
+from importexport import reminder_batches, export_file, ScheduleFileError
+from recurrence import next_occurrence
+from catchup import catch_up, is_overdue, summarize, CATCH_UP_FIRE
+from audio import AudioPlayer, PRIORITY_ALERT, PRIORITY_PREVIEW
+from metrics import TICK_DURATION, PROFILER
+
+
+def reminder_key(reminder):
+    """Key identifying a reminder for the lifetime of the engine."""
+    return reminder.id if reminder.id is not None else id(reminder)
+
+
+def alert_token(reminder):
+    return f"alert:{reminder_key(reminder)}"
+
+
+def preview_token(reminder):
+    return f"preview:{reminder_key(reminder)}"
+
+
+# Token of the audio played for a catch-up summary
+CATCH_UP_TOKEN = "catch-up"
+
+
+class ReminderEngine(QObject):
+    """Scheduling, persistence and audio for reminders, without any widgets.
+
+    The engine runs inside the window for a standalone install, or inside the
+    headless daemon that windows attach to over a local socket.
+    """
+
+    reminder_fired = pyqtSignal(object)
+    missed_reminders = pyqtSignal(str, bool)
+    audio_started = pyqtSignal(object, str)
+    audio_finished = pyqtSignal(object)
+    audio_failed = pyqtSignal(object, str, str)
+    import_finished = pyqtSignal(str, int, object)
+    reload_failed = pyqtSignal(str)
+
+    def __init__(
+        self, reminders_file="reminders.json", parent=None, lookahead=DEFAULT_LOOKAHEAD,
+        retention_days=None, pcm_cache_dir=None,
+    ):
+        super().__init__(parent)
+
+        # Audio playback runs on its own thread
+        self.audio = AudioPlayer(self, pcm_cache_dir=pcm_cache_dir)
+        self.audio.started.connect(self.audio_started)
+        self.audio.finished.connect(self.audio_finished)
+        self.audio.failed.connect(self.audio_failed)
+
+        # Reminders from a JSON file or an SQLite database, loaded by start()
+        self.reminders_file = reminders_file
+        self.store = open_store(reminders_file, self)
+
+        # Reminders that can no longer fire are moved to an append-only history
+        self.history = HistoryStore(history_path(reminders_file), retention_days, self)
+
+        # Edits other programs make to a JSON reminders file are merged in
+        self.file_watcher = None
+        if not isinstance(self.store, SqliteReminderStore):
+            self.file_watcher = ReminderFileWatcher(self.store, self)
+            self.file_watcher.reloaded.connect(self.on_reloaded)
+            self.file_watcher.reload_failed.connect(self.reload_failed)
+
+        # Audio files are checked in the background so broken ones show up early
+        self.validator = AudioValidator(self.store, self)
+
+        # Scheduler firing reminders at their deadlines
+        self.scheduler = ReminderScheduler(self, lookahead)
+        self.scheduler.reminders_due.connect(self.check_reminders)
+        self.scheduler.reminders_upcoming.connect(self.prefetch_audio)
+
+    def start(self):
+        """Load the reminders, catch up on ones missed while stopped and start scheduling."""
+        self.store.load()
+        self.history.open()
+        if self.history.needs_compaction():
+            self.history.compact()
+        # Reminders only just due fire through the scheduler like at runtime
+        now = QDateTime.currentSecsSinceEpoch()
+        results = catch_up([reminder for reminder in self.store if is_overdue(reminder, now)], now)
+        for reminder, _, _ in results:
+            if reminder.active:
+                self.store.update(reminder)
+        self.archive_inactive(self.store)
+        self.scheduler.load(self.store)
+        if self.file_watcher is not None:
+            self.file_watcher.start()
+        if results:
+            # Report once listeners connected after start() are in place
+            QTimer.singleShot(0, lambda: self.report_catch_up(results))
+
+    def close(self):
+        self.audio.shutdown()
+        self.validator.shutdown()
+        if self.file_watcher is not None:
+            self.file_watcher.shutdown()
+        self.store.close()
+        self.history.close()
+
+    def find(self, key):
+        if isinstance(key, str) and key.startswith("archive:"):
+            return self.history.get(int(key[len("archive:"):]))
+        for reminder in self.store:
+            if reminder_key(reminder) == key:
+                return reminder
+        return None
+
+    def add_reminder(self, reminder):
+        self.store.add(reminder)
+        self.scheduler.schedule(reminder)
+
+    def import_file(self, path):
+        """Add all reminders from a CSV or iCalendar file, or none if any is invalid.
+
+        Reports the number added and a list of (line, message) errors
+        through import_finished.
+        """
+        try:
+            count = self.store.extend(reminder_batches(path))
+        except ScheduleFileError as e:
+            self.import_finished.emit(path, 0, e.errors)
+            return
+        except (OSError, ValueError) as e:
+            self.import_finished.emit(path, 0, [(0, str(e))])
+            return
+        if count:
+            self.archive_inactive(self.store.reminders[-count:])
+            self.scheduler.load(self.store)
+        self.import_finished.emit(path, count, [])
+
+    def export_file(self, path):
+        """Write the scheduled reminders to a CSV or iCalendar file."""
+        return export_file(path, self.store)
+
+    def delete_reminder(self, reminder):
+        self.audio.stop(preview_token(reminder))
+        self.audio.stop(alert_token(reminder))
+        if is_archived(reminder):
+            self.history.remove(reminder)
+            return
+        self.store.remove(reminder)
+        self.scheduler.unschedule(reminder)
+
+    def on_reloaded(self, added, changed, removed):
+        """Reschedule reminders another program added, changed or removed in the file."""
+        for reminder in removed:
+            self.audio.stop(preview_token(reminder))
+            self.audio.stop(alert_token(reminder))
+            self.scheduler.unschedule(reminder)
+        for reminder in added + changed:
+            self.scheduler.schedule(reminder)
+        self.archive_inactive(added + changed)
+
+    def archive_inactive(self, reminders):
+        """Move reminders that can no longer fire from the store to the history."""
+        inactive = [reminder for reminder in reminders if not reminder.active]
+        if inactive:
+            self.history.append(inactive)
+            self.store.remove_many(inactive)
+
+    def play_preview(self, reminder):
+        """Play a reminder's audio once, below announcements in priority."""
+        self.audio.play(reminder.audio_file, token=preview_token(reminder), priority=PRIORITY_PREVIEW)
+
+    def stop_audio(self, token=None):
+        """Stop the playback of one token, or all audio when none is given."""
+        self.audio.stop(token)
+
+    def prefetch_audio(self, reminders):
+        """Decode the audio of reminders that are about to fire."""
+        self.audio.prefetch(reminder.audio_file for reminder in reminders)
+
+    def check_reminders(self, due_reminders):
+        """Fire reminders handed over by the scheduler."""
+        with TICK_DURATION.time(), PROFILER.profile("tick"):
+            self._fire(due_reminders)
+
+    def _fire(self, due_reminders):
+        current_time = QDateTime.currentSecsSinceEpoch()
+
+        # Reminders that are well past due were missed during downtime or sleep
+        overdue = [reminder for reminder in due_reminders if is_overdue(reminder, current_time)]
+        overdue_ids = {id(reminder) for reminder in overdue}
+        if overdue:
+            results = catch_up(overdue, current_time)
+            for reminder, _, _ in results:
+                self.scheduler.schedule(reminder)
+                if reminder.active:
+                    self.store.update(reminder)
+            self.archive_inactive(overdue)
+            self.report_catch_up(results)
+
+        finished = []
+        for reminder in due_reminders:
+            if not reminder.active or id(reminder) in overdue_ids:
+                continue
+            self.audio.play(
+                reminder.audio_file, token=alert_token(reminder), loop=True,
+                priority=PRIORITY_ALERT, due_time=reminder.start_time,
+            )
+            self.reminder_fired.emit(reminder)
+            self.advance_recurrence(reminder)
+            if reminder.active:
+                self.scheduler.schedule(reminder)
+                self.store.update(reminder)
+            else:
+                finished.append(reminder)
+        self.archive_inactive(finished)
+
+    def advance_recurrence(self, reminder):
+        """Move a fired reminder to its next occurrence or deactivate it."""
+        next_time = next_occurrence(reminder)
+        if next_time:
+            reminder.start_time = next_time
+        else:
+            reminder.active = False  # One-time or no more occurrences
+
+    def report_catch_up(self, results):
+        """Report missed reminders in a single summary instead of one alert each."""
+        fired = [reminder for reminder, _, policy in results if policy == CATCH_UP_FIRE]
+        if fired:
+            self.audio.play(fired[-1].audio_file, token=CATCH_UP_TOKEN, loop=True)
+
+        text = summarize(results)
+        if text is not None:
+            self.missed_reminders.emit(text, bool(fired))
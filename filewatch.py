@@ -0,0 +1,182 @@
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+from reminder import Reminder
+from validation import file_key
+
+
+# Milliseconds to wait for a writer to finish before reading the file
+RELOAD_DELAY = 250
+
+WHITESPACE = " \t\n\r"
+
+
+def iter_json_array(text):
+    """Yield the items of a JSON array one at a time.
+
+    json.loads() holds the GIL for the whole document; decoding item by item
+    lets the GUI thread run while a large file is parsed on a worker.
+    """
+    decoder = json.JSONDecoder()
+    end = len(text)
+    position = len(text) - len(text.lstrip(WHITESPACE))
+    if text[position:position + 1] != "[":
+        raise ValueError("Reminders file does not hold a list")
+    position += 1
+    expect_item = True
+    empty = True
+    while True:
+        while position < end and text[position] in WHITESPACE:
+            position += 1
+        if position == end:
+            raise ValueError("Unterminated list in reminders file")
+        character = text[position]
+        if character == "]" and (empty or not expect_item):
+            return
+        if character == "," and not expect_item:
+            position += 1
+            expect_item = True
+            continue
+        if not expect_item:
+            raise ValueError(f"Expected ',' at character {position}")
+        item, position = decoder.raw_decode(text, position)
+        expect_item = False
+        empty = False
+        yield item
+
+
+def read_changes(path, reminders):
+    """Worker task: read a reminders file and diff it against `reminders` by id.
+
+    Returns (file key, added, changed, removed), where `changed` holds
+    (reminder, new) pairs. Entries without an id, or repeating an id, are
+    added as new reminders.
+    """
+    key = file_key(path)
+    with open(path, "r") as f:
+        text = f.read()
+    current = {reminder.id: reminder for reminder in reminders}
+    seen = set()
+    added = []
+    changed = []
+    for item in iter_json_array(text):
+        if not isinstance(item, dict) or not isinstance(item.get("recurrence", {}), dict):
+            raise ValueError(f"Not a reminder: {item!r:.60}")
+        reminder = Reminder.from_dict(item)
+        if reminder.id is None or reminder.id in seen:
+            reminder.id = None
+            added.append(reminder)
+            continue
+        seen.add(reminder.id)
+        existing = current.get(reminder.id)
+        if existing is None:
+            added.append(reminder)
+        elif existing.to_dict() != reminder.to_dict():
+            changed.append((existing, reminder))
+    removed = [reminder for reminder in reminders if reminder.id not in seen]
+    return key, added, changed, removed
+
+
+class ReminderFileWatcher(QObject):
+    """Merges changes other programs make to a store's JSON file.
+
+    The file and its folder are watched, so files replaced by a rename are
+    seen too. Changes are read and diffed on a worker thread. Reminders the
+    application changed since its last save keep their local version, and
+    the store does not save until the merge is done.
+    """
+
+    reloaded = pyqtSignal(object, object, object)
+    reload_failed = pyqtSignal(str)
+    _read = pyqtSignal(object)
+
+    def __init__(self, store, parent=None, delay=RELOAD_DELAY):
+        super().__init__(parent)
+        self.store = store
+        self.path = os.path.abspath(store.path)
+        self._reading = False
+        self._again = False
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reload")
+        self._read.connect(self._on_read)
+
+        # Writers often touch a file several times; read once they are done
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay)
+        self._timer.timeout.connect(self._start_read)
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self._on_changed)
+        self.watcher.directoryChanged.connect(self._on_changed)
+        store.external_change.connect(lambda: self._timer.start())
+
+    def start(self):
+        """Start watching; call after the store is loaded."""
+        self.store.watch_external = True
+        self.watcher.addPath(os.path.dirname(self.path))
+        if os.path.exists(self.path):
+            self.watcher.addPath(self.path)
+
+    def shutdown(self):
+        """Stop watching, merging a change that is still pending first."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._timer.stop()
+        if self.store.merge_pending:
+            self._apply(self._read_file(list(self.store.reminders)))
+
+    def _on_changed(self, _):
+        # A file replaced by a rename drops out of the watcher
+        if self.path not in self.watcher.files() and os.path.exists(self.path):
+            self.watcher.addPath(self.path)
+        if file_key(self.path) == self.store.saved_key:
+            return  # Written by the store itself
+        self.store.merge_pending = True
+        self._timer.start()
+
+    def _start_read(self):
+        if self._reading:
+            self._again = True
+            return
+        self._reading = True
+        # The list is copied here since the store changes it on this thread
+        future = self._executor.submit(self._read_file, list(self.store.reminders))
+        future.add_done_callback(lambda future: self._read.emit(future.result()))
+
+    def _read_file(self, reminders):
+        # Any failure is reported so the store always leaves the merge-pending state
+        try:
+            return read_changes(self.path, reminders)
+        except Exception as e:
+            return e
+
+    def _on_read(self, result):
+        self._reading = False
+        if not self.store.merge_pending:
+            return  # Merged by shutdown() in the meantime
+        if self._again or (not isinstance(result, Exception) and result[0] != file_key(self.path)):
+            # Changed again while it was read
+            self._again = False
+            self._start_read()
+            return
+        self._apply(result)
+
+    def _apply(self, result):
+        store = self.store
+        if isinstance(result, Exception):
+            # Keep the reminders in memory; the next save replaces the file
+            store.saved_key = file_key(self.path)
+            store.merge_pending = False
+            self.reload_failed.emit(f"Could not reload {self.path}: {result}")
+            store.mark_dirty()
+            return
+        key, added, changed, removed = result
+        # Local changes not saved yet win over the file
+        unsaved = store.unsaved
+        added = [reminder for reminder in added if reminder.id not in unsaved]
+        changed = [(reminder, new) for reminder, new in changed if reminder.id not in unsaved]
+        removed = [reminder for reminder in removed if reminder.id not in unsaved]
+        store.apply_external(added, changed, removed, key)
+        if added or changed or removed:
+            self.reloaded.emit(added, [reminder for reminder, _ in changed], removed)
+        store.flush()
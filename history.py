@@ -0,0 +1,180 @@
+import os
+import json
+import time
+import bisect
+from PyQt6.QtCore import QObject, pyqtSignal
+from reminder import Reminder
+
+
+# Archived entries are written with this key first, which tells them apart
+# from deletion records without parsing the line
+ENTRY_PREFIX = b'{"archived_at"'
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+def history_path(reminders_file):
+    """Path of the history file kept next to a reminders file."""
+    return os.path.splitext(reminders_file)[0] + ".history.jsonl"
+
+
+def is_archived(reminder):
+    return reminder.extra is not None and "archived_at" in reminder.extra
+
+
+class HistoryStore(QObject):
+    """Append-only archive of reminders that can no longer fire.
+
+    Entries are JSON lines identified by their byte offset in the file, which
+    also gives them the stable key "archive:<offset>". Only the offsets are
+    kept in memory; entries are read from disk a page at a time. Deleting an
+    entry appends a deletion record, and compact() rewrites the file without
+    deleted entries and entries older than the retention period.
+
+    A read-only store follows a file written by another process through
+    refresh().
+    """
+
+    entries_added = pyqtSignal(int, int)
+    entry_removed = pyqtSignal(int)
+    history_reset = pyqtSignal()
+
+    def __init__(self, path=None, retention_days=None, parent=None, writable=True):
+        super().__init__(parent)
+        self.path = path
+        self.retention_days = retention_days
+        self.writable = writable
+        self.offsets = []
+        self.dead_lines = 0
+        self._file = None
+        self._scanned_to = 0
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def open(self, path=None):
+        """Open the history file and index its entries."""
+        if path is not None:
+            self.path = path
+        self.close()
+        if self.writable:
+            self._file = open(self.path, "a+b")
+        elif os.path.exists(self.path):
+            self._file = open(self.path, "rb")
+        self.offsets = []
+        self.dead_lines = 0
+        self._scanned_to = 0
+        if self._file is not None:
+            self._scan(notify=False)
+            if self.writable:
+                # Drop a line left incomplete by a crash during an append
+                self._file.truncate(self._scanned_to)
+        self.history_reset.emit()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def refresh(self):
+        """Pick up entries and deletions written since the last scan."""
+        if self._file is None or os.path.getsize(self.path) < self._scanned_to:
+            # Not created yet, or rewritten by a compaction
+            self.open()
+        else:
+            self._scan(notify=True)
+
+    def read(self, start, count):
+        """Return up to `count` archived reminders starting at row `start`."""
+        return [self._read_entry(offset) for offset in self.offsets[start:start + count]]
+
+    def get(self, archive_id):
+        """Return the archived reminder with an archive id, or None."""
+        row = bisect.bisect_left(self.offsets, archive_id)
+        if row < len(self.offsets) and self.offsets[row] == archive_id:
+            return self._read_entry(archive_id)
+        return None
+
+    def append(self, reminders, now=None):
+        """Archive reminders at the end of the file."""
+        archived_at = int(time.time()) if now is None else now
+        lines = []
+        for reminder in reminders:
+            entry = {"archived_at": archived_at}
+            entry.update(reminder.to_dict())
+            lines.append(json.dumps(entry).encode() + b"\n")
+        self._write(b"".join(lines))
+
+    def remove(self, reminder):
+        """Delete an archived reminder by appending a deletion record."""
+        self._write(json.dumps({"deleted": reminder.extra["archive_id"]}).encode() + b"\n")
+
+    def needs_compaction(self, now=None):
+        """Whether deleted or expired entries make up a large part of the file."""
+        if self.dead_lines > max(len(self.offsets), 1000):
+            return True
+        cutoff = self._cutoff(now)
+        if cutoff is None or not self.offsets:
+            return False
+        return self._read_entry(self.offsets[0]).extra["archived_at"] < cutoff
+
+    def compact(self, now=None):
+        """Rewrite the file without deleted entries and entries past retention."""
+        cutoff = self._cutoff(now)
+        temporary = self.path + ".tmp"
+        self._file.flush()
+        with open(temporary, "wb") as out:
+            for offset in self.offsets:
+                self._file.seek(offset)
+                line = self._file.readline()
+                if cutoff is not None and json.loads(line)["archived_at"] < cutoff:
+                    continue
+                out.write(line)
+        os.replace(temporary, self.path)
+        self.open()
+
+    def _cutoff(self, now):
+        if self.retention_days is None:
+            return None
+        return (int(time.time()) if now is None else now) - self.retention_days * SECONDS_PER_DAY
+
+    def _write(self, data):
+        self._file.seek(0, os.SEEK_END)
+        self._file.write(data)
+        self._file.flush()
+        self._scan(notify=True)
+
+    def _scan(self, notify):
+        self._file.seek(self._scanned_to)
+        position = self._scanned_to
+        first_new = len(self.offsets)
+        for line in self._file:
+            if not line.endswith(b"\n"):
+                break
+            if line.startswith(ENTRY_PREFIX):
+                self.offsets.append(position)
+            else:
+                # Report entries added so far first, so row numbers stay valid
+                if notify and len(self.offsets) > first_new:
+                    self.entries_added.emit(first_new, len(self.offsets) - 1)
+                self._apply_deletion(json.loads(line)["deleted"], notify)
+                first_new = len(self.offsets)
+            position += len(line)
+        self._scanned_to = position
+        if notify and len(self.offsets) > first_new:
+            self.entries_added.emit(first_new, len(self.offsets) - 1)
+
+    def _apply_deletion(self, archive_id, notify):
+        row = bisect.bisect_left(self.offsets, archive_id)
+        if row < len(self.offsets) and self.offsets[row] == archive_id:
+            del self.offsets[row]
+            self.dead_lines += 2
+            if notify:
+                self.entry_removed.emit(row)
+
+    def _read_entry(self, offset):
+        self._file.seek(offset)
+        reminder = Reminder.from_dict(json.loads(self._file.readline()))
+        reminder.extra["archive_id"] = offset
+        reminder.id = f"archive:{offset}"
+        return reminder
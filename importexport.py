@@ -0,0 +1,399 @@
+"""Bulk import and export of reminders as CSV or iCalendar files.
+
+Files are read and written one record at a time, so a schedule with
+hundreds of thousands of entries is never held in memory as text.
+
+CSV files have a header row with the columns in CSV_FIELDS. Start times are
+local times such as "2026-03-01 08:30:00", weekdays are full day names
+separated by ";" and recurrence is one of one_time, daily, weekly or monthly.
+
+iCalendar files hold one VEVENT per reminder: SUMMARY is the task name,
+DTSTART the start time, ATTACH the audio file and RRULE the recurrence.
+Only the rules reminders can express are accepted: FREQ=DAILY,
+FREQ=WEEKLY with INTERVAL and BYDAY, and FREQ=MONTHLY. Weekly reminders on
+several days repeat every week, so an interval above 1 is only accepted
+with a single day, in both formats.
+"""
+import os
+import csv
+from datetime import datetime, timezone
+from recurrence import DAY_NAMES, RECURRENCE_NAMES, DAILY, WEEKLY, MONTHLY
+from catchup import CATCH_UP_POLICIES
+from reminder import Reminder
+
+
+CSV_FIELDS = ["task_name", "start_time", "recurrence", "interval", "days", "audio_file", "active", "catch_up"]
+
+# Reminders validated and added per step of an import
+BATCH_SIZE = 1000
+
+# Errors listed when a file is rejected
+MAX_REPORTED_ERRORS = 20
+
+ICS_DAYS = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+ICS_DATE_FORMAT = "%Y%m%dT%H%M%S"
+CSV_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class ScheduleFileError(ValueError):
+    """Raised when a file contains invalid reminders; nothing is imported."""
+
+    def __init__(self, path, errors):
+        super().__init__(f"{path}: {len(errors)} invalid reminder(s)")
+        self.path = path
+        self.errors = errors
+
+
+def file_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".ics", ".ical", ".ifb", ".icalendar"):
+        return "ics"
+    raise ValueError(f"Unsupported file type: {path}")
+
+
+def validate(reminder):
+    """Raise ValueError if a reminder does not fit the reminder schema."""
+    if not reminder["task_name"]:
+        raise ValueError("task name is empty")
+    if not reminder["audio_file"]:
+        raise ValueError("audio file is empty")
+    recurrence = reminder["recurrence"]
+    if recurrence["type"] not in RECURRENCE_NAMES:
+        raise ValueError(f"unknown recurrence {recurrence['type']!r}")
+    if recurrence["type"] == "weekly":
+        if recurrence["interval"] < 1:
+            raise ValueError("weekly interval must be at least 1")
+        if not recurrence["days"]:
+            raise ValueError("weekly recurrence needs at least one day")
+        if recurrence["interval"] > 1 and len(set(recurrence["days"])) > 1:
+            raise ValueError("weekly interval above 1 needs a single day")
+    if "catch_up" in reminder and reminder["catch_up"] not in CATCH_UP_POLICIES:
+        raise ValueError(f"unknown catch-up policy {reminder['catch_up']!r}")
+
+
+def read_reminders(path):
+    """Yield (line number, reminder or None, error or None) for each record of a file."""
+    reader = read_csv if file_format(path) == "csv" else read_ics
+    for line, convert in reader(path):
+        try:
+            data = convert()
+            validate(data)
+            reminder = Reminder.from_dict(data)
+        except KeyError as e:
+            yield line, None, f"missing {e.args[0]}"
+        except ValueError as e:
+            yield line, None, str(e)
+        else:
+            yield line, reminder, None
+
+
+def check_file(path):
+    """Validate a whole file without importing it. Returns (count, errors)."""
+    count = 0
+    errors = []
+    for line, _, error in read_reminders(path):
+        count += 1
+        if error is not None:
+            errors.append((line, error))
+            if len(errors) >= MAX_REPORTED_ERRORS:
+                break
+    return count, errors
+
+
+def reminder_batches(path, batch_size=BATCH_SIZE):
+    """Yield lists of at most `batch_size` validated reminders.
+
+    Raises ScheduleFileError before the first batch if any record is
+    invalid, so an import either adds the whole file or nothing.
+    """
+    _, errors = check_file(path)
+    if errors:
+        raise ScheduleFileError(path, errors)
+    batch = []
+    for _, reminder, _ in read_reminders(path):
+        batch.append(reminder)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def export_file(path, reminders):
+    """Write reminders to a CSV or iCalendar file. Returns the number written."""
+    writer = write_csv if file_format(path) == "csv" else write_ics
+    return writer(path, reminders)
+
+
+def parse_days(text, names, separator):
+    days = []
+    for part in text.split(separator):
+        part = part.strip()
+        if not part:
+            continue
+        for index, name in enumerate(names):
+            if part.lower() == name.lower():
+                days.append(DAY_NAMES[index])
+                break
+        else:
+            raise ValueError(f"unknown day {part!r}")
+    return days
+
+
+def effective_interval(reminder):
+    """Weeks between repeats; rules on several days repeat every week."""
+    return reminder.interval if bin(reminder.day_mask).count("1") == 1 else 1
+
+
+# CSV
+
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        try:
+            for row in reader:
+                yield reader.line_num, lambda row=row: csv_to_reminder(row)
+        except csv.Error as e:
+            raise ValueError(f"line {reader.line_num}: {e}") from e
+
+
+def csv_to_reminder(row):
+    def field(name, default=""):
+        # Short rows leave missing columns as None
+        return (row.get(name) or default).strip()
+
+    start = field("start_time")
+    if start.isdigit():
+        start_time = int(start)
+    else:
+        start_time = int(datetime.fromisoformat(start).timestamp())
+    rec_type = field("recurrence", "one_time").lower()
+    recurrence = {"type": rec_type}
+    if rec_type == "weekly":
+        recurrence["interval"] = int(field("interval", "1"))
+        recurrence["days"] = parse_days(field("days"), DAY_NAMES, ";")
+    reminder = {
+        "task_name": field("task_name"),
+        "start_time": start_time,
+        "recurrence": recurrence,
+        "audio_file": field("audio_file"),
+        "active": field("active", "true").lower() not in ("0", "false", "no"),
+    }
+    if field("catch_up"):
+        reminder["catch_up"] = field("catch_up")
+    return reminder
+
+
+def write_csv(path, reminders):
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_FIELDS)
+        for reminder in reminders:
+            weekly = reminder.recurrence == WEEKLY
+            writer.writerow([
+                reminder.task_name,
+                datetime.fromtimestamp(reminder.start_time).strftime(CSV_DATE_FORMAT),
+                RECURRENCE_NAMES[reminder.recurrence],
+                effective_interval(reminder) if weekly else "",
+                ";".join(reminder.days) if weekly else "",
+                reminder.audio_file,
+                "true" if reminder.active else "false",
+                reminder.catch_up or "",
+            ])
+            count += 1
+    return count
+
+
+# iCalendar
+
+def unfolded_lines(f):
+    """Yield (line number, content line) with folded continuation lines joined."""
+    pending = None
+    pending_number = 0
+    for number, line in enumerate(f, 1):
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and pending is not None:
+            pending += line[1:]
+            continue
+        if pending is not None:
+            yield pending_number, pending
+        pending, pending_number = line, number
+    if pending is not None:
+        yield pending_number, pending
+
+
+def parse_content_line(line):
+    """Split "NAME;PARAM=x:value" into (NAME, {PARAM: x}, value)."""
+    head, _, value = line.partition(":")
+    if ";" not in head:
+        return head.upper(), {}, value
+    name, *params = head.split(";")
+    parameters = {}
+    for param in params:
+        key, _, param_value = param.partition("=")
+        parameters[key.upper()] = param_value
+    return name.upper(), parameters, value
+
+
+def read_ics(path):
+    with open(path, encoding="utf-8-sig") as f:
+        event = None
+        start_line = 0
+        depth = 0  # Components open inside the current event
+        for number, line in unfolded_lines(f):
+            name, parameters, value = parse_content_line(line)
+            if event is None:
+                if name == "BEGIN" and value.upper() == "VEVENT":
+                    event, start_line, depth = {}, number, 0
+            elif name == "BEGIN":
+                depth += 1
+            elif name == "END" and depth:
+                depth -= 1
+            elif name == "END":
+                if value.upper() == "VEVENT":
+                    yield start_line, lambda event=event: event_to_reminder(event)
+                event = None
+            elif depth == 0 and name not in event:
+                # Properties of nested components such as VALARM are skipped
+                event[name] = (parameters, value)
+
+
+def unescape_text(value):
+    if "\\" not in value:
+        return value
+    result = []
+    characters = iter(value)
+    for character in characters:
+        if character == "\\":
+            escaped = next(characters, "")
+            result.append("\n" if escaped in ("n", "N") else escaped)
+        else:
+            result.append(character)
+    return "".join(result)
+
+
+def escape_text(value):
+    return value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def parse_ics_datetime(value):
+    value = value.strip()
+    utc = value.endswith("Z")
+    if utc:
+        value = value[:-1]
+    if len(value) == 8:
+        value += "T000000"  # All-day date
+    if len(value) != 15 or value[8] != "T" or not (value[:8] + value[9:]).isdigit():
+        raise ValueError(f"invalid date-time {value!r}")
+    # Sliced by hand since strptime dominates the cost of large imports
+    moment = datetime(
+        int(value[0:4]), int(value[4:6]), int(value[6:8]),
+        int(value[9:11]), int(value[11:13]), int(value[13:15]),
+        tzinfo=timezone.utc if utc else None,
+    )
+    # Floating and TZID times are taken as local time
+    return int(moment.timestamp())
+
+
+def rrule_to_recurrence(rule, start_time):
+    parts = dict(part.partition("=")[::2] for part in rule.upper().split(";") if part)
+    frequency = parts.pop("FREQ", None)
+    interval = int(parts.pop("INTERVAL", "1"))
+    by_day = parts.pop("BYDAY", None)
+    parts.pop("WKST", None)
+    if parts:
+        raise ValueError(f"unsupported RRULE parts: {', '.join(parts)}")
+    if frequency == "WEEKLY":
+        if by_day is None:
+            days = [DAY_NAMES[datetime.fromtimestamp(start_time).weekday()]]
+        else:
+            days = parse_days(by_day, ICS_DAYS, ",")
+        return {"type": "weekly", "interval": interval, "days": days}
+    if by_day is not None:
+        raise ValueError("BYDAY is only supported for weekly rules")
+    if interval != 1:
+        raise ValueError(f"INTERVAL={interval} is only supported for weekly rules")
+    if frequency == "DAILY":
+        return {"type": "daily"}
+    if frequency == "MONTHLY":
+        return {"type": "monthly"}
+    raise ValueError(f"unsupported FREQ {frequency}")
+
+
+def event_to_reminder(event):
+    start_time = parse_ics_datetime(event["DTSTART"][1])
+    if "RRULE" in event:
+        recurrence = rrule_to_recurrence(event["RRULE"][1], start_time)
+    else:
+        recurrence = {"type": "one_time"}
+    reminder = {
+        "task_name": unescape_text(event.get("SUMMARY", ({}, ""))[1]).strip(),
+        "start_time": start_time,
+        "recurrence": recurrence,
+        "audio_file": event.get("ATTACH", ({}, ""))[1].strip(),
+        "active": event.get("STATUS", ({}, ""))[1].upper() != "CANCELLED",
+    }
+    if "X-AMZ-CATCH-UP" in event:
+        reminder["catch_up"] = event["X-AMZ-CATCH-UP"][1].strip()
+    return reminder
+
+
+def recurrence_to_rrule(reminder):
+    recurrence = reminder.recurrence
+    if recurrence == DAILY:
+        return "FREQ=DAILY"
+    if recurrence == WEEKLY:
+        days = ",".join(ICS_DAYS[index] for index in range(7) if reminder.day_mask & (1 << index))
+        return f"FREQ=WEEKLY;INTERVAL={effective_interval(reminder)};BYDAY={days}"
+    if recurrence == MONTHLY:
+        return "FREQ=MONTHLY"
+    return None
+
+
+def fold(line):
+    """Fold a content line into lines of at most 75 octets."""
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return line + "\r\n"
+    pieces = []
+    limit = 75
+    while data:
+        cut = min(limit, len(data))
+        # Do not split a multi-byte character
+        while cut < len(data) and (data[cut] & 0xC0) == 0x80:
+            cut -= 1
+        pieces.append(data[:cut].decode("utf-8"))
+        data = data[cut:]
+        limit = 74
+    return "\r\n ".join(pieces) + "\r\n"
+
+
+def write_ics(path, reminders):
+    count = 0
+    stamp = datetime.now(timezone.utc).strftime(ICS_DATE_FORMAT) + "Z"
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//AMZ Announcement//EN\r\n")
+        for reminder in reminders:
+            count += 1
+            lines = [
+                "BEGIN:VEVENT",
+                f"UID:{count if reminder.id is None else reminder.id}-{reminder.start_time}@amz-announcement",
+                f"DTSTAMP:{stamp}",
+                f"DTSTART:{datetime.fromtimestamp(reminder.start_time).strftime(ICS_DATE_FORMAT)}",
+                f"SUMMARY:{escape_text(reminder.task_name)}",
+                f"ATTACH:{reminder.audio_file}",
+            ]
+            rule = recurrence_to_rrule(reminder)
+            if rule is not None:
+                lines.append(f"RRULE:{rule}")
+            if not reminder.active:
+                lines.append("STATUS:CANCELLED")
+            if reminder.catch_up is not None:
+                lines.append(f"X-AMZ-CATCH-UP:{reminder.catch_up}")
+            lines.append("END:VEVENT")
+            f.write("".join(fold(line) for line in lines))
+        f.write("END:VCALENDAR\r\n")
+    return count
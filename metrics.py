@@ -0,0 +1,158 @@
+import os
+import time
+import bisect
+import cProfile
+import threading
+from contextlib import contextmanager
+from PyQt6.QtCore import QObject, QTimer
+
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+DEFAULT_WRITE_INTERVAL = 15
+
+
+class Histogram:
+    """Cumulative histogram rendered in the Prometheus text format.
+
+    Safe to observe from the audio thread and the GUI thread.
+    """
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.sum += value
+            self.count += 1
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def render(self):
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            lines.append(f'{self.name}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {count}')
+        lines.append(f"{self.name}_sum {total}")
+        lines.append(f"{self.name}_count {count}")
+        return "\n".join(lines)
+
+
+FIRING_LATENCY = Histogram("amz_firing_latency_seconds", "Delay from a reminder's start time until its audio starts.")
+TICK_DURATION = Histogram("amz_tick_duration_seconds", "Time spent firing the reminders due in one scheduler pass.")
+SAVE_DURATION = Histogram("amz_save_duration_seconds", "Time spent writing reminders to storage.")
+REFRESH_DURATION = Histogram("amz_refresh_duration_seconds", "Time spent updating views after a reminder changed.")
+TIMER_DRIFT = Histogram("amz_timer_drift_seconds", "How late the scheduler timer fired compared with when it was armed for.")
+HISTOGRAMS = [FIRING_LATENCY, TICK_DURATION, SAVE_DURATION, REFRESH_DURATION, TIMER_DRIFT]
+
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    return "\n".join(histogram.render() for histogram in HISTOGRAMS) + "\n"
+
+
+class SlowTickProfiler:
+    """Profiles scheduler passes and dumps the ones slower than a threshold."""
+
+    def __init__(self):
+        self.directory = None
+        self.threshold = 0.2
+
+    def enable(self, directory, threshold):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.threshold = threshold
+
+    @contextmanager
+    def profile(self, name):
+        if self.directory is None:
+            yield
+            return
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            if time.perf_counter() - start > self.threshold:
+                stamp = time.strftime("%Y%m%d-%H%M%S")
+                profiler.dump_stats(os.path.join(self.directory, f"{name}-{stamp}-{os.getpid()}.prof"))
+
+
+PROFILER = SlowTickProfiler()
+
+
+class StartupProfile:
+    """Records the phases of application start and reports their durations."""
+
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self.phases = []
+
+    def mark(self, name):
+        self.phases.append((name, time.perf_counter()))
+
+    def report(self):
+        lines = [f"{'Phase':<24} {'Duration':>10} {'Elapsed':>10}"]
+        previous = self.start
+        for name, moment in self.phases:
+            lines.append(f"{name:<24} {(moment - previous) * 1000:>7.1f} ms {(moment - self.start) * 1000:>7.1f} ms")
+            previous = moment
+        return "\n".join(lines)
+
+
+class MetricsWriter(QObject):
+    """Periodically writes the metrics to a text file, e.g. for a textfile collector."""
+
+    def __init__(self, path, interval=DEFAULT_WRITE_INTERVAL, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.write)
+        self.timer.start(interval * 1000)
+
+    def write(self):
+        # Write to a temporary file first so readers never see a partial file
+        temporary = self.path + ".tmp"
+        with open(temporary, "w") as f:
+            f.write(render())
+        os.replace(temporary, self.path)
+
+
+def add_arguments(parser):
+    parser.add_argument("--metrics-file", help="periodically write Prometheus metrics to this file")
+    parser.add_argument(
+        "--metrics-interval", type=int, default=DEFAULT_WRITE_INTERVAL,
+        help="seconds between metrics file writes",
+    )
+    parser.add_argument("--profile-dir", help="dump cProfile stats of slow scheduler passes into this directory")
+    parser.add_argument(
+        "--slow-tick-ms", type=int, default=200,
+        help="scheduler passes slower than this are profiled when --profile-dir is set",
+    )
+
+
+def setup(args, parent=None):
+    """Apply the metrics command line options. Returns the writer, if any."""
+    if args.profile_dir:
+        PROFILER.enable(args.profile_dir, args.slow_tick_ms / 1000)
+    if args.metrics_file:
+        return MetricsWriter(args.metrics_file, args.metrics_interval, parent)
+    return None
@@ -0,0 +1,383 @@
+import itertools
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, QDateTime, QEvent, QRect, Qt, pyqtSignal
+from PyQt6.QtGui import QBrush, QColor, QIcon
+from PyQt6.QtWidgets import QApplication, QStyle, QStyledItemDelegate, QStyleOptionButton
+from recurrence import DAILY, WEEKLY, MONTHLY, SECONDS_PER_DAY
+from timeline import upcoming, with_overlaps
+
+
+PLAY_COLUMN = 3
+DELETE_COLUMN = 4
+BUTTON_SIZE = 30
+
+
+def format_recurrence(reminder):
+    """Format the recurrence information of a reminder for display."""
+    recurrence = reminder.recurrence
+    if recurrence == DAILY:
+        return "Daily"
+    elif recurrence == WEEKLY:
+        days_str = ', '.join(reminder.days)
+        return f"Weekly, every {reminder.interval} week(s) on {days_str}"
+    elif recurrence == MONTHLY:
+        return "Monthly"
+    else:
+        return "One time"
+
+
+# Archived reminders read from the history file per fetch
+HISTORY_PAGE_SIZE = 200
+
+# Upcoming announcements generated per fetch
+TIMELINE_PAGE_SIZE = 200
+
+# Separate row ranges above which a batch removal resets the model instead
+REMOVE_RESET_RANGES = 64
+
+
+class ReminderRowsModel(QAbstractTableModel):
+    """Columns, icons and row bookkeeping shared by the reminder tables."""
+
+    HEADERS = ["Task Name", "Start Time", "Recurrence", "", ""]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.playing = None
+        self.validator = None
+        self._rows = []
+        self._index = {}
+
+        self.play_icon = QIcon.fromTheme('media-playback-start')
+        self.stop_icon = QIcon.fromTheme('media-playback-stop')
+        self.delete_icon = QIcon.fromTheme('edit-delete')
+        self.warning_icon = QIcon.fromTheme('dialog-warning')
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal:
+            if role == Qt.ItemDataRole.DisplayRole:
+                return self.HEADERS[section]
+            if role == Qt.ItemDataRole.TextAlignmentRole:
+                return Qt.AlignmentFlag.AlignCenter
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        reminder = self._rows[index.row()]
+        column = index.column()
+        if column == 0 and role in (Qt.ItemDataRole.ToolTipRole, Qt.ItemDataRole.ForegroundRole, Qt.ItemDataRole.DecorationRole):
+            # Flag reminders whose audio file cannot be played
+            error = self.validator.error(reminder.audio_file) if self.validator is not None else None
+            if error is None:
+                return None
+            if role == Qt.ItemDataRole.ToolTipRole:
+                return f"{error}: {reminder.audio_file}"
+            if role == Qt.ItemDataRole.ForegroundRole:
+                return QBrush(QColor("red"))
+            return self.warning_icon
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                return reminder.task_name
+            if column == 1:
+                return QDateTime.fromSecsSinceEpoch(reminder.start_time).toString("dd/MM/yyyy hh:mm:ss")
+            if column == 2:
+                return format_recurrence(reminder)
+        elif role == Qt.ItemDataRole.DecorationRole:
+            if column == PLAY_COLUMN:
+                return self.stop_icon if reminder is self.playing else self.play_icon
+            if column == DELETE_COLUMN:
+                return self.delete_icon
+        elif role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+        return None
+
+    def flags(self, index):
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+
+    def reminder(self, row):
+        return self._rows[row]
+
+    def row_of(self, reminder):
+        """Return the row of a reminder, or -1 if this model does not hold it."""
+        return self._index.get(id(reminder), -1)
+
+    def set_validator(self, validator):
+        """Flag rows whose audio file the validator found unplayable."""
+        self.validator = validator
+        validator.results_changed.connect(self._on_validation_changed)
+        self._on_validation_changed()
+
+    def _on_validation_changed(self, paths=None):
+        if self._rows:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self._rows) - 1, 0))
+
+    def set_playing(self, reminder):
+        """Mark the reminder whose audio is playing from the table."""
+        previous, self.playing = self.playing, reminder
+        for item in (previous, reminder):
+            row = self.row_of(item) if item is not None else -1
+            if row >= 0:
+                index = self.index(row, PLAY_COLUMN)
+                self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+
+    def _append(self, reminder):
+        row = len(self._rows)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._rows.append(reminder)
+        self._index[id(reminder)] = row
+        self.endInsertRows()
+
+    def _remove(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        reminder = self._rows.pop(row)
+        del self._index[id(reminder)]
+        for later in range(row, len(self._rows)):
+            self._index[id(self._rows[later])] = later
+        self.endRemoveRows()
+
+    def _remove_many(self, reminders):
+        """Remove the rows of several reminders, reindexing the rest once."""
+        rows = sorted({self._index[id(reminder)] for reminder in reminders if id(reminder) in self._index})
+        if not rows:
+            return
+        ranges = []
+        for row in rows:
+            if ranges and ranges[-1][1] == row - 1:
+                ranges[-1][1] = row
+            else:
+                ranges.append([row, row])
+        if len(ranges) > REMOVE_RESET_RANGES:
+            self.beginResetModel()
+            doomed = set(rows)
+            self._rows = [reminder for row, reminder in enumerate(self._rows) if row not in doomed]
+            self._index = {id(reminder): row for row, reminder in enumerate(self._rows)}
+            self.endResetModel()
+            return
+        # Bottom up, so the rows of the ranges still to go do not move
+        for first, last in reversed(ranges):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self._rows[first:last + 1]
+            self.endRemoveRows()
+        self._index = {id(reminder): row for row, reminder in enumerate(self._rows)}
+
+
+class ReminderTableModel(ReminderRowsModel):
+    """Table model over the active or inactive reminders of a store."""
+
+    def __init__(self, store, active, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.active = active
+        self._rebuild()
+
+        store.reminder_added.connect(self._on_reminder_added)
+        store.reminder_removed.connect(self._on_reminder_removed)
+        store.reminders_removed.connect(self._remove_many)
+        store.reminder_changed.connect(self._on_reminder_changed)
+        store.reminders_reset.connect(self._on_reminders_reset)
+
+    def _rebuild(self):
+        self._rows = [reminder for reminder in self.store if reminder.active == self.active]
+        self._index = {id(reminder): row for row, reminder in enumerate(self._rows)}
+
+    def _on_reminder_added(self, reminder):
+        if reminder.active == self.active:
+            self._append(reminder)
+
+    def _on_reminder_removed(self, reminder):
+        row = self.row_of(reminder)
+        if row >= 0:
+            self._remove(row)
+
+    def _on_reminders_reset(self):
+        self.beginResetModel()
+        self._rebuild()
+        self.endResetModel()
+
+    def _on_reminder_changed(self, reminder):
+        row = self.row_of(reminder)
+        belongs = reminder.active == self.active
+        if row >= 0 and belongs:
+            self.dataChanged.emit(self.index(row, 0), self.index(row, 2), [Qt.ItemDataRole.DisplayRole])
+        elif row >= 0:
+            self._remove(row)
+        elif belongs:
+            self._append(reminder)
+
+
+class HistoryTableModel(ReminderRowsModel):
+    """Table model paging archived reminders in from a history store."""
+
+    def __init__(self, history, parent=None):
+        super().__init__(parent)
+        self.history = history
+        history.entries_added.connect(self._on_entries_added)
+        history.entry_removed.connect(self._on_entry_removed)
+        history.history_reset.connect(self._on_history_reset)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and len(self._rows) < len(self.history)
+
+    def fetchMore(self, parent=QModelIndex()):
+        start = len(self._rows)
+        reminders = self.history.read(start, HISTORY_PAGE_SIZE)
+        if not reminders:
+            return
+        self.beginInsertRows(QModelIndex(), start, start + len(reminders) - 1)
+        for row, reminder in enumerate(reminders, start):
+            self._rows.append(reminder)
+            self._index[id(reminder)] = row
+        self.endInsertRows()
+
+    def _on_entries_added(self, first, last):
+        # Entries beyond the rows fetched so far are read on a later fetch
+        if first == len(self._rows):
+            self.fetchMore()
+
+    def _on_entry_removed(self, row):
+        if row < len(self._rows):
+            self._remove(row)
+
+    def _on_history_reset(self):
+        self.beginResetModel()
+        self._rows = []
+        self._index = {}
+        self.endResetModel()
+
+
+class TimelineTableModel(QAbstractTableModel):
+    """Table model over the announcements due in the next `days` days.
+
+    Rows are occurrences, so a recurring reminder can appear many times.
+    They are generated lazily as the view scrolls, and announcements that
+    start while another is still playing are flagged.
+    """
+
+    HEADERS = ["Time", "Task Name", "Audio File"]
+
+    def __init__(self, store, validator=None, days=1, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.validator = validator
+        self.days = days
+        self._rows = []
+        self._events = iter(())
+        self._exhausted = True
+        self.warning_icon = QIcon.fromTheme('dialog-warning')
+        self.refresh()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal:
+            if role == Qt.ItemDataRole.DisplayRole:
+                return self.HEADERS[section]
+            if role == Qt.ItemDataRole.TextAlignmentRole:
+                return Qt.AlignmentFlag.AlignCenter
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        time, reminder, overlapped = self._rows[index.row()]
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                return QDateTime.fromSecsSinceEpoch(time).toString("dd/MM/yyyy hh:mm:ss")
+            if column == 1:
+                return reminder.task_name
+            if column == 2:
+                return reminder.audio_file
+        elif column == 1 and overlapped:
+            if role == Qt.ItemDataRole.ToolTipRole:
+                return "\n".join(
+                    f"Starts while \"{other.task_name}\" ({QDateTime.fromSecsSinceEpoch(start).toString('hh:mm:ss')}) is still playing"
+                    for start, other in overlapped
+                )
+            if role == Qt.ItemDataRole.ForegroundRole:
+                return QBrush(QColor("red"))
+            if role == Qt.ItemDataRole.DecorationRole:
+                return self.warning_icon
+        elif role == Qt.ItemDataRole.TextAlignmentRole and column == 0:
+            return Qt.AlignmentFlag.AlignCenter
+        return None
+
+    def flags(self, index):
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        rows = list(itertools.islice(self._events, TIMELINE_PAGE_SIZE))
+        if len(rows) < TIMELINE_PAGE_SIZE:
+            self._exhausted = True
+        if not rows:
+            return
+        start = len(self._rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+        self._rows.extend(rows)
+        self.endInsertRows()
+
+    def set_days(self, days):
+        self.days = days
+        self.refresh()
+
+    def refresh(self, now=None):
+        """Start the timeline over from `now`, after reminders changed."""
+        start = QDateTime.currentSecsSinceEpoch() if now is None else now
+        length = self.validator.length if self.validator is not None else None
+        self.beginResetModel()
+        self._rows = []
+        events = upcoming(list(self.store), start, start + self.days * SECONDS_PER_DAY)
+        self._events = with_overlaps(events, length)
+        self._exhausted = False
+        self.endResetModel()
+
+    def drop_past(self, now=None):
+        """Remove the rows of announcements that have already started."""
+        now = QDateTime.currentSecsSinceEpoch() if now is None else now
+        count = 0
+        while count < len(self._rows) and self._rows[count][0] < now:
+            count += 1
+        if count:
+            self.beginRemoveRows(QModelIndex(), 0, count - 1)
+            del self._rows[:count]
+            self.endRemoveRows()
+
+
+class ButtonDelegate(QStyledItemDelegate):
+    """Paints a push button with the cell's icon and reports clicks on it."""
+
+    clicked = pyqtSignal(QModelIndex)
+
+    def button_rect(self, option):
+        rect = QRect(0, 0, BUTTON_SIZE, BUTTON_SIZE)
+        rect.moveCenter(option.rect.center())
+        return rect
+
+    def paint(self, painter, option, index):
+        button = QStyleOptionButton()
+        button.rect = self.button_rect(option)
+        button.icon = index.data(Qt.ItemDataRole.DecorationRole) or QIcon()
+        button.iconSize = option.decorationSize
+        button.state = QStyle.StateFlag.State_Enabled | QStyle.StateFlag.State_Raised
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawControl(QStyle.ControlElement.CE_PushButton, button, painter, option.widget)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.Type.MouseButtonRelease and event.button() == Qt.MouseButton.LeftButton:
+            if self.button_rect(option).contains(event.position().toPoint()):
+                self.clicked.emit(index)
+                return True
+        return super().editorEvent(event, model, option, index)
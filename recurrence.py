@@ -0,0 +1,253 @@
+import time
+import bisect
+import calendar
+from datetime import datetime, timedelta
+
+
+DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+DAY_BITS = {day: 1 << index for index, day in enumerate(DAY_NAMES)}
+SECONDS_PER_DAY = 86400
+
+# Recurrence codes, indexing the type names used in reminder files
+ONE_TIME, DAILY, WEEKLY, MONTHLY = range(4)
+RECURRENCE_NAMES = ("one_time", "daily", "weekly", "monthly")
+RECURRENCE_CODES = {name: code for code, name in enumerate(RECURRENCE_NAMES)}
+
+
+def _build_offset_table():
+    """Precompute, for every weekday set and weekday, the days until the next match.
+
+    Only offsets 1-6 are stored; 0 means the set holds no other weekday, so the
+    next occurrence falls on the same weekday one interval later.
+    """
+    table = []
+    for mask in range(128):
+        row = []
+        for weekday in range(7):
+            offset = 0
+            for days_ahead in range(1, 7):
+                if mask & (1 << ((weekday + days_ahead) % 7)):
+                    offset = days_ahead
+                    break
+            row.append(offset)
+        table.append(row)
+    return table
+
+
+NEXT_DAY_OFFSET = _build_offset_table()
+
+
+def days_to_mask(days):
+    """Convert a list of day names into a weekday bitmask (Monday is bit 0)."""
+    mask = 0
+    for day in days:
+        mask |= DAY_BITS[day]
+    return mask
+
+
+def mask_to_days(mask):
+    """Convert a weekday bitmask back into a list of day names."""
+    return [day for day in DAY_NAMES if mask & DAY_BITS[day]]
+
+
+def weekly_offset(weekday, interval, mask):
+    """Days from a date on `weekday` (0 = Monday) to the next weekly occurrence."""
+    offset = NEXT_DAY_OFFSET[mask][weekday]
+    if offset:
+        return offset
+    # Only the same weekday is selected: skip ahead by the interval
+    return 7 * interval
+
+
+def compute_next_weekly_occurrence(last_time, interval, days):
+    """Compute the next occurrence time for a weekly recurring reminder.
+
+    `days` may be a list of day names or a weekday bitmask. The time of day
+    is that of `last_time`; one falling in a DST gap moves forward by the
+    length of the gap, and later occurrences keep the moved time.
+    """
+    mask = days if isinstance(days, int) else days_to_mask(days)
+    if not mask:
+        return None  # No days selected
+    last = datetime.fromtimestamp(last_time)
+    offset = weekly_offset(last.weekday(), interval, mask)
+    return int((last + timedelta(days=offset)).timestamp())
+
+
+def add_months(start_time, months):
+    """Add months to a timestamp, clamping the day to the target month."""
+    start = datetime.fromtimestamp(start_time)
+    month = start.month + months
+    year = start.year + (month - 1) // 12
+    month = (month - 1) % 12 + 1
+    day = min(start.day, calendar.monthrange(year, month)[1])
+    return int(start.replace(year=year, month=month, day=day).timestamp())
+
+
+def next_occurrence(reminder, start_time=None):
+    """Return the occurrence following a reminder's start time, or None if there is none.
+
+    `start_time` replaces the reminder's own start time, to step through
+    later occurrences without changing the reminder.
+    """
+    if start_time is None:
+        start_time = reminder.start_time
+    recurrence = reminder.recurrence
+    if recurrence == DAILY:
+        return start_time + SECONDS_PER_DAY
+    elif recurrence == WEEKLY:
+        return compute_next_weekly_occurrence(start_time, reminder.interval, reminder.day_mask)
+    elif recurrence == MONTHLY:
+        return add_months(start_time, 1)
+    return None
+
+
+def next_occurrences(reminders):
+    """Compute the next occurrence for many reminders in one pass.
+
+    Returns a list aligned with `reminders`, holding None for reminders that do
+    not recur. Local date conversions are shared between reminders with the
+    same start time, which is the common case for imported schedules.
+    """
+    local_times = {}
+    results = []
+    append = results.append
+    for reminder in reminders:
+        start_time = reminder.start_time
+        recurrence = reminder.recurrence
+        if recurrence == DAILY:
+            append(start_time + SECONDS_PER_DAY)
+            continue
+        if recurrence != WEEKLY and recurrence != MONTHLY:
+            append(None)
+            continue
+
+        local = local_times.get(start_time)
+        if local is None:
+            local = local_times[start_time] = datetime.fromtimestamp(start_time)
+
+        if recurrence == WEEKLY:
+            mask = reminder.day_mask
+            if not mask:
+                append(None)
+                continue
+            offset = weekly_offset(local.weekday(), reminder.interval, mask)
+            append(int((local + timedelta(days=offset)).timestamp()))
+        else:
+            year, month = (local.year, local.month + 1) if local.month < 12 else (local.year + 1, 1)
+            day = min(local.day, calendar.monthrange(year, month)[1])
+            append(int(local.replace(year=year, month=month, day=day).timestamp()))
+    return results
+
+
+def first_occurrence_after(reminder, now):
+    """Jump a reminder's recurrence straight to its first occurrence after `now`.
+
+    Returns (next_time, missed), where `missed` counts the occurrences at or
+    before `now`, including the current start time itself. next_time is None
+    when the reminder does not recur. The result is the one stepping with
+    next_occurrence() reaches, also across DST changes.
+    """
+    start_time = reminder.start_time
+    if start_time > now:
+        return start_time, 0
+    recurrence = reminder.recurrence
+    if recurrence == DAILY:
+        missed = (now - start_time) // SECONDS_PER_DAY + 1
+        return start_time + missed * SECONDS_PER_DAY, missed
+    elif recurrence == WEEKLY:
+        return _weekly_after(start_time, reminder.interval, reminder.day_mask, now)
+    elif recurrence == MONTHLY:
+        return _monthly_after(start_time, now)
+    return None, 1
+
+
+def _weekly_after(start_time, interval, mask, now):
+    if not mask:
+        return None, 1
+    local = datetime.fromtimestamp(start_time)
+    now_date = datetime.fromtimestamp(now).date()
+
+    # After the first step the sequence repeats every week, visiting each
+    # selected day once, or every `interval` weeks when one day is selected.
+    selected = bin(mask).count("1")
+    period, per_period = (7 * interval, 1) if selected == 1 else (7, selected)
+
+    missed = 1
+    while True:
+        next_time = int((local + timedelta(days=weekly_offset(local.weekday(), interval, mask))).timestamp())
+        if next_time > now:
+            return next_time, missed
+        # Re-read like compute_next_weekly_occurrence(), so a time in a DST gap
+        # moves later occurrences the same way
+        local = datetime.fromtimestamp(next_time)
+        missed += 1
+        # Skip whole periods that end before today, stopping short of the next
+        # UTC offset change so an occurrence in a DST gap is not skipped over
+        periods = ((now_date - local.date()).days - 1) // period
+        if periods > 0:
+            periods = min(periods, (next_offset_change(next_time) - next_time - 1) // (period * SECONDS_PER_DAY))
+        if periods > 0:
+            local += timedelta(days=periods * period)
+            missed += periods * per_period
+
+
+def _monthly_after(start_time, now):
+    # Day clamping and DST gaps make each step depend on the previous month,
+    # so months are stepped one at a time as add_months() does.
+    local = datetime.fromtimestamp(start_time)
+    missed = 1
+    while True:
+        year, month = (local.year, local.month + 1) if local.month < 12 else (local.year + 1, 1)
+        day = min(local.day, calendar.monthrange(year, month)[1])
+        next_time = int(local.replace(year=year, month=month, day=day).timestamp())
+        if next_time > now:
+            return next_time, missed
+        local = datetime.fromtimestamp(next_time)
+        missed += 1
+
+
+def utc_offset(timestamp):
+    """Seconds the local time zone is ahead of UTC at `timestamp`."""
+    return time.localtime(timestamp).tm_gmtoff
+
+
+# Offset changes of the local time zone per year, found on first use
+_offset_changes = {}
+
+
+def offset_changes(year):
+    """Timestamps in `year` from which the local UTC offset differs from just before."""
+    changes = _offset_changes.get(year)
+    if changes is None:
+        changes = []
+        moment = int(datetime(year, 1, 1).timestamp())
+        end = int(datetime(year + 1, 1, 1).timestamp())
+        # Sampled weekly; no time zone changes its offset twice within a week
+        while moment < end:
+            later = min(moment + 7 * SECONDS_PER_DAY, end)
+            if utc_offset(later) != utc_offset(moment):
+                low, high = moment, later
+                while high - low > 1:
+                    middle = (low + high) // 2
+                    if utc_offset(middle) == utc_offset(low):
+                        low = middle
+                    else:
+                        high = middle
+                changes.append(high)
+            moment = later
+        _offset_changes[year] = changes
+    return changes
+
+
+def next_offset_change(timestamp):
+    """First UTC offset change after `timestamp`.
+
+    Returns the start of the year after next when there is none before it.
+    """
+    year = datetime.fromtimestamp(timestamp).year
+    for changes in (offset_changes(year), offset_changes(year + 1)):
+        index = bisect.bisect_right(changes, timestamp)
+        if index < len(changes):
+            return changes[index]
+    return int(datetime(year + 2, 1, 1).timestamp())
@@ -0,0 +1,106 @@
+import sys
+from recurrence import (
+    ONE_TIME, WEEKLY, RECURRENCE_NAMES, RECURRENCE_CODES, days_to_mask, mask_to_days,
+)
+
+
+class Reminder:
+    """A reminder held as a compact record.
+
+    The recurrence is stored as an integer code with the weekly days as a
+    weekday bitmask, and audio paths are interned so reminders sharing a file
+    share one string. Keys a record has no field for are kept in `extra`
+    (top level) and `recurrence_extra` (inside "recurrence"), so a reminder
+    read with from_dict() is written back by to_dict() with the same content.
+    """
+
+    __slots__ = (
+        "task_name", "start_time", "recurrence", "interval", "day_mask",
+        "audio_file", "active", "catch_up", "id", "extra", "recurrence_extra",
+    )
+
+    def __init__(self, task_name, start_time, audio_file, recurrence=ONE_TIME, interval=1, day_mask=0,
+                 active=True, catch_up=None, id=None, extra=None, recurrence_extra=None):
+        self.task_name = task_name
+        self.start_time = start_time
+        self.recurrence = recurrence
+        self.interval = interval
+        self.day_mask = day_mask
+        self.audio_file = sys.intern(audio_file)
+        self.active = active
+        self.catch_up = catch_up
+        self.id = id
+        self.extra = extra
+        self.recurrence_extra = recurrence_extra
+
+    def __repr__(self):
+        return f"Reminder({self.task_name!r}, {self.start_time}, {RECURRENCE_NAMES[self.recurrence]})"
+
+    @property
+    def days(self):
+        """Selected weekdays as a list of day names, in calendar order."""
+        return mask_to_days(self.day_mask)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a reminder from its JSON form."""
+        extra = {key: value for key, value in data.items() if key not in DICT_KEYS}
+        recurrence = data.get("recurrence", {"type": "one_time"})
+        name = recurrence.get("type", "one_time")
+        code = RECURRENCE_CODES.get(name)
+        if code == WEEKLY:
+            known = WEEKLY_KEYS
+            interval = recurrence.get("interval", 1)
+            day_mask = days_to_mask(recurrence.get("days", []))
+        else:
+            known = ("type",) if code is not None else ()
+            interval, day_mask = 1, 0
+        recurrence_extra = {key: value for key, value in recurrence.items() if key not in known}
+        return cls(
+            data["task_name"],
+            data["start_time"],
+            data["audio_file"],
+            ONE_TIME if code is None else code,
+            interval,
+            day_mask,
+            data.get("active", True),
+            data.get("catch_up"),
+            data.get("id"),
+            extra or None,
+            recurrence_extra or None,
+        )
+
+    def recurrence_dict(self):
+        """The recurrence in its JSON form."""
+        recurrence = {"type": RECURRENCE_NAMES[self.recurrence]}
+        if self.recurrence == WEEKLY:
+            recurrence["interval"] = self.interval
+            recurrence["days"] = mask_to_days(self.day_mask)
+        if self.recurrence_extra:
+            recurrence.update(self.recurrence_extra)
+        return recurrence
+
+    def to_dict(self):
+        """The reminder in its JSON form, without the store id."""
+        data = {
+            "task_name": self.task_name,
+            "start_time": self.start_time,
+            "recurrence": self.recurrence_dict(),
+            "audio_file": self.audio_file,
+            "active": self.active,
+        }
+        if self.catch_up is not None:
+            data["catch_up"] = self.catch_up
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def assign(self, other):
+        """Copy every field of another reminder into this one."""
+        for name in self.__slots__:
+            setattr(self, name, getattr(other, name))
+
+
+# Keys of the JSON form that map onto fields
+DICT_KEYS = frozenset(("task_name", "start_time", "recurrence", "audio_file", "active", "catch_up", "id"))
+WEEKLY_KEYS = ("type", "interval", "days")
@@ -0,0 +1,333 @@
+import os
+import sys
+import json
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtNetwork import QLocalServer, QLocalSocket
+from engine import reminder_key
+from reminder import Reminder
+from history import HistoryStore
+from importexport import export_file
+from validation import AudioValidator
+from metrics import REFRESH_DURATION
+
+
+# Name of the local socket the daemon listens on
+SERVER_NAME = "amz-announcement"
+
+# How long a window waits for the daemon when attaching
+CONNECT_TIMEOUT = 3000
+
+
+def encode(message):
+    return json.dumps(message).encode() + b"\n"
+
+
+def wire_reminder(reminder):
+    """JSON form of a reminder carrying its engine key as "id"."""
+    data = reminder.to_dict()
+    data["id"] = reminder_key(reminder)
+    return data
+
+
+def reminder_from_wire(data):
+    """Build a reminder a window sent, rejecting fields of the wrong type."""
+    if not isinstance(data, dict):
+        raise TypeError("reminder is not an object")
+    reminder = Reminder.from_dict(data)
+    if not (
+        isinstance(reminder.task_name, str) and type(reminder.start_time) is int
+        and isinstance(reminder.active, bool) and type(reminder.interval) is int and reminder.interval > 0
+    ):
+        raise ValueError("reminder has fields of the wrong type")
+    return reminder
+
+
+# Errors a malformed message raises while it is handled
+MESSAGE_ERRORS = (KeyError, TypeError, ValueError, AttributeError)
+
+
+class ReminderServer(QObject):
+    """Serves an engine's reminders to windows attached over a local socket.
+
+    Messages are JSON objects, one per line. Clients send {"op": ...}
+    requests; the server answers a new connection with a snapshot of all
+    reminders and then pushes {"event": ...} notifications for every change.
+    Archived reminders are not sent: windows read the history file named in
+    the snapshot themselves and are told when to re-read it. Malformed
+    requests are dropped and reported through request_failed.
+    """
+
+    request_failed = pyqtSignal(str)
+
+    def __init__(self, engine, name=SERVER_NAME, parent=None):
+        super().__init__(parent)
+        self.engine = engine
+        self.clients = []
+        self.server = QLocalServer(self)
+        self.server.newConnection.connect(self._on_new_connection)
+        # Remove a socket file left behind by a crashed daemon
+        QLocalServer.removeServer(name)
+        if not self.server.listen(name):
+            raise RuntimeError(f"Cannot listen on {name}: {self.server.errorString()}")
+
+        store = engine.store
+        store.reminder_added.connect(lambda reminder: self.broadcast("added", reminder=wire_reminder(reminder)))
+        store.reminder_removed.connect(lambda reminder: self.broadcast("removed", id=reminder_key(reminder)))
+        store.reminders_removed.connect(
+            lambda reminders: self.broadcast("removed_many", ids=[reminder_key(reminder) for reminder in reminders])
+        )
+        store.reminder_changed.connect(lambda reminder: self.broadcast("changed", reminder=wire_reminder(reminder)))
+        store.reminders_reset.connect(self._on_reminders_reset)
+        engine.reminder_fired.connect(lambda reminder: self.broadcast("fired", id=reminder_key(reminder)))
+        engine.missed_reminders.connect(lambda text, with_stop: self.broadcast("missed", text=text, with_stop=with_stop))
+        engine.audio_started.connect(lambda token, path: self.broadcast("audio_started", token=token, path=path))
+        engine.audio_finished.connect(lambda token: self.broadcast("audio_finished", token=token))
+        engine.audio_failed.connect(lambda token, path, text: self.broadcast("audio_failed", token=token, path=path, text=text))
+        engine.import_finished.connect(lambda path, count, errors: self.broadcast("imported", path=path, count=count, errors=errors))
+        engine.history.entries_added.connect(lambda first, last: self.broadcast("history"))
+        engine.history.entry_removed.connect(lambda row: self.broadcast("history"))
+        engine.history.history_reset.connect(lambda: self.broadcast("history"))
+
+    def broadcast(self, event, **fields):
+        data = encode(dict(fields, event=event))
+        for socket in self.clients:
+            socket.write(data)
+
+    def _on_new_connection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            self.clients.append(socket)
+            socket.readyRead.connect(lambda socket=socket: self._on_ready_read(socket))
+            socket.disconnected.connect(lambda socket=socket: self._on_disconnected(socket))
+            socket.write(self._snapshot())
+
+    def _snapshot(self):
+        reminders = [wire_reminder(reminder) for reminder in self.engine.store]
+        history = os.path.abspath(self.engine.history.path)
+        return encode({"event": "snapshot", "reminders": reminders, "history": history})
+
+    def _on_reminders_reset(self):
+        # Bulk changes are sent as a new snapshot rather than one event per reminder
+        if self.clients:
+            data = self._snapshot()
+            for socket in self.clients:
+                socket.write(data)
+
+    def _on_disconnected(self, socket):
+        if socket in self.clients:
+            self.clients.remove(socket)
+        socket.deleteLater()
+
+    def _on_ready_read(self, socket):
+        while socket.canReadLine():
+            try:
+                message = json.loads(bytes(socket.readLine()))
+            except ValueError:
+                continue
+            # An exception escaping a slot would abort the service
+            try:
+                self._handle(message)
+            except MESSAGE_ERRORS as e:
+                self.request_failed.emit(f"Dropped request {message!r:.80}: {e!r}")
+
+    def _handle(self, message):
+        if not isinstance(message, dict):
+            raise TypeError("request is not an object")
+        op = message.get("op")
+        engine = self.engine
+        if op == "add":
+            reminder = reminder_from_wire(message["reminder"])
+            reminder.id = None
+            engine.add_reminder(reminder)
+        elif op == "delete":
+            reminder = engine.find(message["id"])
+            if reminder is not None:
+                engine.delete_reminder(reminder)
+        elif op == "preview":
+            reminder = engine.find(message["id"])
+            if reminder is not None:
+                engine.play_preview(reminder)
+        elif op == "stop":
+            token = message.get("token")
+            if token is not None and not isinstance(token, str):
+                raise TypeError("token is not a string")
+            engine.stop_audio(token)
+        elif op == "import":
+            path = message["path"]
+            if not isinstance(path, str):
+                raise TypeError("path is not a string")
+            engine.import_file(path)
+
+
+class MirrorStore(QObject):
+    """Client-side copy of the daemon's reminders with the store's signals."""
+
+    reminder_added = pyqtSignal(object)
+    reminder_removed = pyqtSignal(object)
+    reminders_removed = pyqtSignal(object)
+    reminder_changed = pyqtSignal(object)
+    reminders_reset = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.reminders = []
+        self.by_id = {}
+
+    def __iter__(self):
+        return iter(self.reminders)
+
+    def __len__(self):
+        return len(self.reminders)
+
+    def reset(self, reminders):
+        self.reminders = reminders
+        self.by_id = {reminder.id: reminder for reminder in reminders}
+        self.reminders_reset.emit()
+
+    def apply_added(self, reminder):
+        self.reminders.append(reminder)
+        self.by_id[reminder.id] = reminder
+        with REFRESH_DURATION.time():
+            self.reminder_added.emit(reminder)
+
+    def apply_removed(self, key):
+        reminder = self.by_id.pop(key, None)
+        if reminder is None:
+            return
+        for index, item in enumerate(self.reminders):
+            if item is reminder:
+                del self.reminders[index]
+                break
+        with REFRESH_DURATION.time():
+            self.reminder_removed.emit(reminder)
+
+    def apply_removed_many(self, keys):
+        removed = [self.by_id.pop(key) for key in keys if key in self.by_id]
+        if not removed:
+            return
+        doomed = {id(reminder) for reminder in removed}
+        self.reminders = [reminder for reminder in self.reminders if id(reminder) not in doomed]
+        with REFRESH_DURATION.time():
+            self.reminders_removed.emit(removed)
+
+    def apply_changed(self, changed):
+        reminder = self.by_id.get(changed.id)
+        if reminder is None:
+            self.apply_added(changed)
+            return
+        # Update in place so views keep pointing at the same object
+        reminder.assign(changed)
+        with REFRESH_DURATION.time():
+            self.reminder_changed.emit(reminder)
+
+    def close(self):
+        pass
+
+
+class RemoteEngine(QObject):
+    """Stands in for ReminderEngine in a window attached to the daemon."""
+
+    reminder_fired = pyqtSignal(object)
+    missed_reminders = pyqtSignal(str, bool)
+    audio_started = pyqtSignal(object, str)
+    audio_finished = pyqtSignal(object)
+    audio_failed = pyqtSignal(object, str, str)
+    import_finished = pyqtSignal(str, int, object)
+    disconnected = pyqtSignal()
+
+    def __init__(self, name=SERVER_NAME, parent=None):
+        super().__init__(parent)
+        self.name = name
+        self.store = MirrorStore(self)
+        self.history = HistoryStore(parent=self, writable=False)
+        self.validator = AudioValidator(self.store, self)
+        self.socket = QLocalSocket(self)
+        self.socket.readyRead.connect(self._on_ready_read)
+        self.socket.disconnected.connect(self.disconnected)
+        self._have_snapshot = False
+
+    def connect_to_daemon(self, timeout=CONNECT_TIMEOUT):
+        """Attach to the daemon and wait for its snapshot. Returns success."""
+        self.socket.connectToServer(self.name)
+        if not self.socket.waitForConnected(timeout):
+            return False
+        while not self._have_snapshot:
+            if not self.socket.waitForReadyRead(timeout):
+                return False
+            self._on_ready_read()
+        return True
+
+    def start(self):
+        pass
+
+    def close(self):
+        self.socket.disconnectFromServer()
+        self.validator.shutdown()
+        self.history.close()
+
+    def add_reminder(self, reminder):
+        self._send(op="add", reminder=reminder.to_dict())
+
+    def delete_reminder(self, reminder):
+        self._send(op="delete", id=reminder.id)
+
+    def play_preview(self, reminder):
+        self._send(op="preview", id=reminder.id)
+
+    def stop_audio(self, token=None):
+        self._send(op="stop", token=token)
+
+    def import_file(self, path):
+        # The service reads the file itself, so it must be able to reach it
+        self._send(op="import", path=os.path.abspath(path))
+
+    def export_file(self, path):
+        return export_file(path, self.store)
+
+    def _send(self, **message):
+        self.socket.write(encode(message))
+
+    def _on_ready_read(self):
+        while self.socket.canReadLine():
+            try:
+                message = json.loads(bytes(self.socket.readLine()))
+            except ValueError:
+                continue
+            try:
+                self._handle(message)
+            except MESSAGE_ERRORS as e:
+                print(f"Dropped message from the service {message!r:.80}: {e!r}", file=sys.stderr)
+
+    def _handle(self, message):
+        if not isinstance(message, dict):
+            raise TypeError("message is not an object")
+        event = message.get("event")
+        store = self.store
+        if event == "snapshot":
+            store.reset([Reminder.from_dict(data) for data in message["reminders"]])
+            self.history.open(message["history"])
+            self._have_snapshot = True
+        elif event == "added":
+            store.apply_added(Reminder.from_dict(message["reminder"]))
+        elif event == "removed":
+            store.apply_removed(message["id"])
+        elif event == "removed_many":
+            store.apply_removed_many(message["ids"])
+        elif event == "changed":
+            store.apply_changed(Reminder.from_dict(message["reminder"]))
+        elif event == "history":
+            self.history.refresh()
+        elif event == "imported":
+            self.import_finished.emit(message["path"], message["count"], message["errors"])
+        elif event == "fired":
+            reminder = store.by_id.get(message["id"])
+            if reminder is not None:
+                self.reminder_fired.emit(reminder)
+        elif event == "missed":
+            self.missed_reminders.emit(message["text"], message["with_stop"])
+        elif event == "audio_started":
+            self.audio_started.emit(message["token"], message["path"])
+        elif event == "audio_finished":
+            self.audio_finished.emit(message["token"])
+        elif event == "audio_failed":
+            self.audio_failed.emit(message["token"], message["path"], message["text"])
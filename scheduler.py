@@ -0,0 +1,162 @@
+import heapq
+import itertools
+from PyQt6.QtCore import QObject, QTimer, QDateTime, Qt, pyqtSignal
+from metrics import TIMER_DRIFT
+
+
+# Upper bound for a single timer wait. Long waits are split so that changes
+# to the wall clock are picked up within a minute.
+MAX_TIMER_INTERVAL = 60 * 1000
+
+# Seconds ahead of a deadline at which a reminder is announced as upcoming
+DEFAULT_LOOKAHEAD = 5 * 60
+
+
+class ReminderScheduler(QObject):
+    """Deadline-driven scheduler keeping active reminders in a min-heap."""
+
+    reminders_due = pyqtSignal(object)
+    reminders_upcoming = pyqtSignal(object)
+
+    def __init__(self, parent=None, lookahead=DEFAULT_LOOKAHEAD):
+        super().__init__(parent)
+        self.lookahead = lookahead
+        self._heap = []
+        self._entries = {}
+        self._counter = itertools.count()
+        self._announced_until = 0
+        # Wall clock time in milliseconds the timer was last armed to fire at
+        self._armed_for = None
+
+        # Single one-shot timer armed for the earliest deadline
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.timeout.connect(self._on_timeout)
+
+        # Second one-shot timer announcing reminders entering the look-ahead window
+        self._lookahead_timer = QTimer(self)
+        self._lookahead_timer.setSingleShot(True)
+        self._lookahead_timer.timeout.connect(self._on_lookahead_timeout)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def load(self, reminders):
+        """Replace the schedule with the active reminders from an iterable."""
+        self._heap = []
+        self._entries = {}
+        for reminder in reminders:
+            if reminder.active:
+                entry = [reminder.start_time, next(self._counter), reminder]
+                self._entries[id(reminder)] = entry
+                self._heap.append(entry)
+        heapq.heapify(self._heap)
+        self._announced_until = 0
+        self._arm()
+        if self._heap:
+            self._arm_lookahead(self._heap[0][0])
+
+    def schedule(self, reminder):
+        """Add a reminder, or move it if its start time has changed."""
+        self._discard(reminder)
+        if reminder.active:
+            entry = [reminder.start_time, next(self._counter), reminder]
+            self._entries[id(reminder)] = entry
+            heapq.heappush(self._heap, entry)
+            if entry[0] <= self._announced_until:
+                self.reminders_upcoming.emit([reminder])
+            else:
+                self._arm_lookahead(entry[0])
+        self._arm()
+
+    def unschedule(self, reminder):
+        """Remove a reminder from the schedule."""
+        if self._discard(reminder):
+            self._arm()
+
+    def next_deadline(self):
+        """Return the earliest scheduled start time, or None if idle."""
+        self._prune()
+        return self._heap[0][0] if self._heap else None
+
+    def upcoming(self, until):
+        """Return (reminders due by `until` earliest first, next start time after it).
+
+        Walks only the part of the heap at or before `until`.
+        """
+        reminders = []
+        frontier = [(self._heap[0][0], self._heap[0][1], 0)] if self._heap else []
+        while frontier:
+            start_time, _, position = heapq.heappop(frontier)
+            if start_time > until:
+                return reminders, start_time
+            reminder = self._heap[position][2]
+            if reminder is not None:
+                reminders.append(reminder)
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < len(self._heap):
+                    entry = self._heap[child]
+                    heapq.heappush(frontier, (entry[0], entry[1], child))
+        return reminders, None
+
+    def _discard(self, reminder):
+        entry = self._entries.pop(id(reminder), None)
+        if entry is None:
+            return False
+        # Lazy deletion: the entry is dropped when it reaches the top
+        entry[2] = None
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [e for e in self._heap if e[2] is not None]
+            heapq.heapify(self._heap)
+        return True
+
+    def _prune(self):
+        while self._heap and self._heap[0][2] is None:
+            heapq.heappop(self._heap)
+
+    def _arm(self):
+        """Arm the timer for the earliest deadline."""
+        deadline = self.next_deadline()
+        if deadline is None:
+            self._timer.stop()
+            return
+        now = QDateTime.currentMSecsSinceEpoch()
+        delay = max(0, min(deadline * 1000 - now, MAX_TIMER_INTERVAL))
+        self._armed_for = now + delay
+        self._timer.start(delay)
+
+    def _arm_lookahead(self, start_time):
+        """Make sure the look-ahead timer fires before `start_time` enters the window."""
+        delay = (start_time - self.lookahead) * 1000 - QDateTime.currentMSecsSinceEpoch()
+        delay = max(0, min(delay, MAX_TIMER_INTERVAL))
+        if not self._lookahead_timer.isActive() or self._lookahead_timer.remainingTime() > delay:
+            self._lookahead_timer.start(delay)
+
+    def _on_lookahead_timeout(self):
+        window_end = QDateTime.currentDateTime().toSecsSinceEpoch() + self.lookahead
+        reminders, next_time = self.upcoming(window_end)
+        fresh = [reminder for reminder in reminders if reminder.start_time > self._announced_until]
+        self._announced_until = window_end
+        if next_time is not None:
+            self._arm_lookahead(next_time)
+        if fresh:
+            self.reminders_upcoming.emit(fresh)
+
+    def _on_timeout(self):
+        now = QDateTime.currentMSecsSinceEpoch()
+        if self._armed_for is not None:
+            TIMER_DRIFT.observe(max(0, now - self._armed_for) / 1000)
+        current_time = now // 1000
+        due = []
+        self._prune()
+        while self._heap and self._heap[0][0] <= current_time:
+            entry = heapq.heappop(self._heap)
+            reminder = entry[2]
+            if reminder is not None:
+                del self._entries[id(reminder)]
+                due.append(reminder)
+            self._prune()
+        self._arm()
+        if due:
+            self.reminders_due.emit(due)
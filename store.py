@@ -0,0 +1,381 @@
+import os
+import json
+import uuid
+import sqlite3
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from metrics import SAVE_DURATION, REFRESH_DURATION
+from reminder import Reminder
+from validation import file_key
+
+
+def new_reminder_id():
+    """Stable id for a reminder kept in a JSON file."""
+    return uuid.uuid4().hex
+
+
+class ReminderStore(QObject):
+    """In-memory reminder list persisted to a JSON file.
+
+    Mutations mark the store dirty and are written out once per event loop
+    iteration, so several changes made in the same tick cost a single save.
+    The file is replaced atomically, and every reminder carries a stable id
+    so changes made to the file by other programs can be merged in.
+
+    With watch_external set, a save finding the file changed since it was
+    last read or written emits external_change and waits for the change to
+    be merged through apply_external() instead of overwriting it.
+    """
+
+    reminder_added = pyqtSignal(object)
+    reminder_removed = pyqtSignal(object)
+    reminders_removed = pyqtSignal(object)
+    reminder_changed = pyqtSignal(object)
+    reminders_reset = pyqtSignal()
+    external_change = pyqtSignal()
+
+    def __init__(self, path, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.reminders = []
+        self.dirty = False
+        # Ids of reminders added, changed or removed since the last save
+        self.unsaved = set()
+        # Size and modification time of the file as last read or written
+        self.saved_key = None
+        self.watch_external = False
+        self.merge_pending = False
+
+    def __iter__(self):
+        return iter(self.reminders)
+
+    def __len__(self):
+        return len(self.reminders)
+
+    def load(self):
+        if os.path.exists(self.path):
+            self.saved_key = file_key(self.path)
+            with open(self.path, "r") as f:
+                self.reminders = [Reminder.from_dict(data) for data in json.load(f)]
+        else:
+            self.reminders = []
+        self.dirty = False
+        self.unsaved = set()
+        self.merge_pending = False
+        missing = [reminder for reminder in self.reminders if reminder.id is None]
+        for reminder in missing:
+            reminder.id = new_reminder_id()
+        if missing:
+            # Write the new ids back so they stay stable
+            self.mark_dirty()
+        self.reminders_reset.emit()
+        return self.reminders
+
+    def add(self, reminder):
+        if reminder.id is None:
+            reminder.id = new_reminder_id()
+        self.reminders.append(reminder)
+        self.unsaved.add(reminder.id)
+        self.mark_dirty()
+        with REFRESH_DURATION.time():
+            self.reminder_added.emit(reminder)
+
+    def extend(self, batches):
+        """Add reminders from an iterable of lists as one change.
+
+        Views are refreshed once at the end through reminders_reset. If the
+        batches raise, the reminders added so far are taken out again.
+        Returns the number of reminders added.
+        """
+        before = len(self.reminders)
+        try:
+            for batch in batches:
+                for reminder in batch:
+                    if reminder.id is None:
+                        reminder.id = new_reminder_id()
+                self.reminders.extend(batch)
+        except BaseException:
+            del self.reminders[before:]
+            raise
+        added = len(self.reminders) - before
+        if added:
+            self.unsaved.update(reminder.id for reminder in self.reminders[before:])
+            self.mark_dirty()
+            with REFRESH_DURATION.time():
+                self.reminders_reset.emit()
+        return added
+
+    def remove(self, reminder):
+        for index, item in enumerate(self.reminders):
+            if item is reminder:
+                del self.reminders[index]
+                break
+        else:
+            return
+        self.unsaved.add(reminder.id)
+        self.mark_dirty()
+        with REFRESH_DURATION.time():
+            self.reminder_removed.emit(reminder)
+
+    def remove_many(self, reminders):
+        """Remove several reminders in one pass over the list.
+
+        Listeners are told once through reminders_removed with the list of
+        reminders taken out.
+        """
+        doomed = {id(reminder) for reminder in reminders}
+        removed = [reminder for reminder in self.reminders if id(reminder) in doomed]
+        if not removed:
+            return
+        self.reminders = [reminder for reminder in self.reminders if id(reminder) not in doomed]
+        self.unsaved.update(reminder.id for reminder in removed)
+        self.mark_dirty()
+        with REFRESH_DURATION.time():
+            self.reminders_removed.emit(removed)
+
+    def update(self, reminder):
+        """Record that a reminder was modified in place."""
+        self.unsaved.add(reminder.id)
+        self.mark_dirty()
+        with REFRESH_DURATION.time():
+            self.reminder_changed.emit(reminder)
+
+    def mark_dirty(self):
+        if not self.dirty:
+            self.dirty = True
+            QTimer.singleShot(0, self.flush)
+
+    def apply_external(self, added, changed, removed, key):
+        """Merge changes another program made to the file, then allow saving again.
+
+        `changed` holds (reminder, new) pairs; reminders are updated in place
+        so views and the scheduler keep pointing at the same objects. `key`
+        is the file key of the content the changes were read from.
+        """
+        self.saved_key = key
+        self.merge_pending = False
+        if removed:
+            doomed = {id(reminder) for reminder in removed}
+            self.reminders = [reminder for reminder in self.reminders if id(reminder) not in doomed]
+        missing = [reminder for reminder in added if reminder.id is None]
+        for reminder in missing:
+            reminder.id = new_reminder_id()
+        self.reminders.extend(added)
+        with REFRESH_DURATION.time():
+            if removed:
+                self.reminders_removed.emit(removed)
+            for reminder, new in changed:
+                reminder.assign(new)
+                self.reminder_changed.emit(reminder)
+            for reminder in added:
+                self.reminder_added.emit(reminder)
+        if missing:
+            self.unsaved.update(reminder.id for reminder in missing)
+            self.mark_dirty()
+
+    def flush(self):
+        """Write the reminders to disk if anything changed since the last save."""
+        if not self.dirty or self.merge_pending:
+            return
+        if self.watch_external and file_key(self.path) != self.saved_key:
+            # Changed by another program since it was read: merge that first
+            self.merge_pending = True
+            self.external_change.emit()
+            return
+        self.dirty = False
+        temporary = self.path + ".tmp"
+        with SAVE_DURATION.time():
+            with open(temporary, "w") as f:
+                json.dump([dict(id=reminder.id, **reminder.to_dict()) for reminder in self.reminders], f, indent=4)
+            os.replace(temporary, self.path)
+        self.saved_key = file_key(self.path)
+        self.unsaved = set()
+
+    def close(self):
+        # Changes made to the file after the last merge are overwritten
+        self.merge_pending = False
+        self.watch_external = False
+        self.flush()
+
+
+class SqliteReminderStore(ReminderStore):
+    """Reminder store backed by an SQLite database in WAL mode.
+
+    Adds and deletes touch a single row, changed reminders are rewritten
+    individually, and everything done in one event loop iteration is
+    committed as one transaction.
+    """
+
+    def __init__(self, path, parent=None):
+        super().__init__(path, parent)
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            """CREATE TABLE IF NOT EXISTS reminders (
+                id INTEGER PRIMARY KEY,
+                task_name TEXT NOT NULL,
+                start_time INTEGER NOT NULL,
+                active INTEGER NOT NULL,
+                audio_file TEXT NOT NULL,
+                recurrence TEXT NOT NULL,
+                extra TEXT NOT NULL DEFAULT '{}'
+            )"""
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS reminders_due ON reminders (active, start_time)")
+        self.db.commit()
+        self.by_id = {}
+        self.changed = {}
+
+    def load(self):
+        rows = self.db.execute(
+            "SELECT id, task_name, start_time, active, audio_file, recurrence, extra FROM reminders ORDER BY id"
+        )
+        self.reminders = [self._from_row(row) for row in rows]
+        self.by_id = {reminder.id: reminder for reminder in self.reminders}
+        self.changed = {}
+        self.dirty = False
+        self.reminders_reset.emit()
+        return self.reminders
+
+    def migrate_json(self, json_path):
+        """Import a reminders.json file into an empty database, once.
+
+        The JSON file is renamed afterwards so it is not imported again.
+        Returns the number of reminders imported.
+        """
+        if not os.path.exists(json_path):
+            return 0
+        if self.db.execute("SELECT 1 FROM reminders LIMIT 1").fetchone():
+            return 0
+        with open(json_path, "r") as f:
+            reminders = [Reminder.from_dict(data) for data in json.load(f)]
+        with self.db:
+            self.db.executemany(
+                "INSERT INTO reminders (task_name, start_time, active, audio_file, recurrence, extra) VALUES (?, ?, ?, ?, ?, ?)",
+                (self._to_row(reminder)[1:] for reminder in reminders),
+            )
+        os.replace(json_path, json_path + ".migrated")
+        return len(reminders)
+
+    def add(self, reminder):
+        cursor = self.db.execute(
+            "INSERT INTO reminders (task_name, start_time, active, audio_file, recurrence, extra) VALUES (?, ?, ?, ?, ?, ?)",
+            self._to_row(reminder)[1:],
+        )
+        reminder.id = cursor.lastrowid
+        self.by_id[reminder.id] = reminder
+        super().add(reminder)
+
+    def extend(self, batches):
+        # Commit pending work first so a failed import rolls back nothing else
+        self.flush()
+
+        def insert(batch):
+            for reminder in batch:
+                cursor = self.db.execute(
+                    "INSERT INTO reminders (task_name, start_time, active, audio_file, recurrence, extra) VALUES (?, ?, ?, ?, ?, ?)",
+                    self._to_row(reminder)[1:],
+                )
+                reminder.id = cursor.lastrowid
+            return batch
+
+        try:
+            added = super().extend(insert(batch) for batch in batches)
+        except BaseException:
+            self.db.rollback()
+            raise
+        for reminder in self.reminders[len(self.reminders) - added:]:
+            self.by_id[reminder.id] = reminder
+        return added
+
+    def remove(self, reminder):
+        if self.by_id.pop(reminder.id, None) is None:
+            return
+        self.db.execute("DELETE FROM reminders WHERE id = ?", (reminder.id,))
+        self.changed.pop(reminder.id, None)
+        super().remove(reminder)
+
+    def remove_many(self, reminders):
+        ids = [reminder.id for reminder in reminders if self.by_id.pop(reminder.id, None) is not None]
+        if not ids:
+            return
+        self.db.executemany("DELETE FROM reminders WHERE id = ?", ((key,) for key in ids))
+        for key in ids:
+            self.changed.pop(key, None)
+        super().remove_many(reminders)
+
+    def update(self, reminder):
+        self.changed[reminder.id] = reminder
+        super().update(reminder)
+
+    def next_due(self, limit, after=None):
+        """Return up to `limit` active reminders in start time order."""
+        if after is None:
+            rows = self.db.execute(
+                "SELECT id FROM reminders WHERE active = 1 ORDER BY start_time LIMIT ?", (limit,)
+            )
+        else:
+            rows = self.db.execute(
+                "SELECT id FROM reminders WHERE active = 1 AND start_time > ? ORDER BY start_time LIMIT ?",
+                (after, limit),
+            )
+        return [self.by_id[row[0]] for row in rows]
+
+    def flush(self):
+        """Write changed rows and commit if anything changed since the last commit."""
+        if not self.dirty:
+            return
+        self.dirty = False
+        with SAVE_DURATION.time():
+            if self.changed:
+                self.db.executemany(
+                    "UPDATE reminders SET task_name = ?, start_time = ?, active = ?, audio_file = ?, recurrence = ?, extra = ? WHERE id = ?",
+                    (self._to_row(reminder)[1:] + (reminder.id,) for reminder in self.changed.values()),
+                )
+                self.changed = {}
+            self.db.commit()
+        self.unsaved = set()
+
+    def close(self):
+        self.flush()
+        self.db.close()
+
+    def _to_row(self, reminder):
+        # Fields without a column, such as the catch-up policy, go in extra
+        extra = dict(reminder.extra) if reminder.extra else {}
+        if reminder.catch_up is not None:
+            extra["catch_up"] = reminder.catch_up
+        return (
+            reminder.id,
+            reminder.task_name,
+            reminder.start_time,
+            int(reminder.active),
+            reminder.audio_file,
+            json.dumps(reminder.recurrence_dict()),
+            json.dumps(extra),
+        )
+
+    def _from_row(self, row):
+        data = json.loads(row[6])
+        data.update(
+            id=row[0],
+            task_name=row[1],
+            start_time=row[2],
+            recurrence=json.loads(row[5]),
+            audio_file=row[4],
+            active=bool(row[3]),
+        )
+        return Reminder.from_dict(data)
+
+
+def open_store(path, parent=None):
+    """Open the store for a reminders file, picking the backend by extension.
+
+    An SQLite database imports the reminders.json file next to it the first
+    time it is opened.
+    """
+    if os.path.splitext(path)[1] in (".db", ".sqlite", ".sqlite3"):
+        store = SqliteReminderStore(path, parent)
+        store.migrate_json(os.path.join(os.path.dirname(path), "reminders.json"))
+        return store
+    return ReminderStore(path, parent)
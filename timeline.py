@@ -0,0 +1,80 @@
+"""Upcoming announcements of many reminders, generated lazily in time order.
+
+Each active reminder yields its occurrences one at a time, stepping its
+recurrence the same way the engine advances it when it fires. The streams
+are merged through a heap holding one pending occurrence per reminder, so
+the next N announcements of R reminders cost O(R + N log R) however far
+their schedules reach.
+"""
+import heapq
+from recurrence import first_occurrence_after, next_occurrence
+
+
+# Seconds an announcement is assumed to play when its audio length is unknown
+DEFAULT_ANNOUNCEMENT_LENGTH = 30
+
+
+def occurrences(reminder, start=None):
+    """Yield a reminder's start times in order, from `start` on when given."""
+    if not reminder.active:
+        return
+    time = reminder.start_time
+    if start is not None and time < start:
+        time, _ = first_occurrence_after(reminder, start - 1)
+    while time is not None:
+        yield time
+        time = next_occurrence(reminder, time)
+
+
+def upcoming(reminders, start, end=None, limit=None):
+    """Yield (time, reminder) for occurrences from `start` on, earliest first.
+
+    Stops after `end` or after `limit` occurrences when given. Occurrences at
+    the same time keep the order of `reminders`.
+    """
+    heap = []
+    for order, reminder in enumerate(reminders):
+        stream = occurrences(reminder, start)
+        time = next(stream, None)
+        if time is not None and (end is None or time <= end):
+            heap.append((time, order, reminder, stream))
+    heapq.heapify(heap)
+    count = 0
+    while heap and (limit is None or count < limit):
+        time, order, reminder, stream = heap[0]
+        yield time, reminder
+        count += 1
+        following = next(stream, None)
+        if following is None or (end is not None and following > end):
+            heapq.heappop(heap)
+        else:
+            heapq.heapreplace(heap, (following, order, reminder, stream))
+
+
+def with_overlaps(events, length=None):
+    """Yield (time, reminder, overlapped) for events in time order.
+
+    `overlapped` lists the (time, reminder) of earlier announcements still
+    playing when this one starts, which it would be mixed over or cut off
+    by. `length(audio_file)` gives the seconds an announcement plays, or None
+    to use DEFAULT_ANNOUNCEMENT_LENGTH.
+    """
+    lengths = {}
+    playing = []  # Heap of (end time, order, time, reminder)
+    for order, (time, reminder) in enumerate(events):
+        while playing and playing[0][0] <= time:
+            heapq.heappop(playing)
+        overlapped = [(start, other) for _, _, start, other in sorted(playing, key=lambda entry: entry[1])]
+        seconds = lengths.get(reminder.audio_file)
+        if seconds is None:
+            seconds = length(reminder.audio_file) if length is not None else None
+            if seconds is None:
+                seconds = DEFAULT_ANNOUNCEMENT_LENGTH
+            lengths[reminder.audio_file] = seconds
+        heapq.heappush(playing, (time + seconds, order, time, reminder))
+        yield time, reminder, overlapped
+
+
+def find_overlaps(reminders, start, end, length=None):
+    """Return the events of with_overlaps() between `start` and `end` that overlap another."""
+    return [event for event in with_overlaps(upcoming(reminders, start, end), length) if event[2]]
@@ -0,0 +1,229 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+
+
+# Threads checking audio files in parallel
+DEFAULT_VALIDATION_WORKERS = 4
+
+# Bytes read from the start of a file to recognise its format
+HEADER_SIZE = 64 * 1024
+
+MP3_BITRATE_BAD = 0b1111
+MP3_SAMPLE_RATE_BAD = 0b11
+MP3_LAYER_III = 0b01
+MP3_VERSION_1 = 0b11
+
+# Layer III bitrates in kbit/s by bitrate index, for MPEG 1 and MPEG 2/2.5
+MP3_BITRATES_V1 = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+MP3_BITRATES_V2 = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)
+
+
+def check_wav(header):
+    """Return (error, length in seconds or None) for the header of a WAVE file."""
+    if header[8:12] != b"WAVE":
+        return "Not a WAVE file", None
+    position = 12
+    byte_rate = 0
+    found = set()
+    while position + 8 <= len(header):
+        chunk_id = header[position:position + 4]
+        chunk_size = int.from_bytes(header[position + 4:position + 8], "little")
+        found.add(chunk_id)
+        if chunk_id == b"fmt ":
+            byte_rate = int.from_bytes(header[position + 16:position + 20], "little")
+        if chunk_id == b"data":
+            if not chunk_size:
+                return "WAVE file has no audio data", None
+            return None, chunk_size / byte_rate if byte_rate else None
+        position += 8 + chunk_size + (chunk_size & 1)
+    if b"fmt " not in found:
+        return "WAVE file has no format chunk", None
+    # The data chunk starts beyond the header that was read
+    return None, None
+
+
+def mp3_length(header, position, file_size):
+    """Estimate the length of an MP3 file from its first frame, assuming a constant bitrate."""
+    version = (header[position + 1] >> 3) & 0b11
+    if (header[position + 1] >> 1) & 0b11 != MP3_LAYER_III:
+        return None
+    bitrates = MP3_BITRATES_V1 if version == MP3_VERSION_1 else MP3_BITRATES_V2
+    bitrate = bitrates[header[position + 2] >> 4]
+    if not bitrate:
+        return None  # Free format
+    return (file_size - position) * 8 / (bitrate * 1000)
+
+
+def check_mp3(header, file_size):
+    """Return (error, estimated length in seconds or None) for the header of an MP3 file."""
+    position = 0
+    if header[:3] == b"ID3":
+        # Skip the ID3v2 tag; its size is stored as four 7-bit bytes
+        size = 0
+        for byte in header[6:10]:
+            size = (size << 7) | (byte & 0x7F)
+        position = 10 + size
+        if position + 4 > len(header):
+            return None, None  # Tag larger than the header read, assume audio follows
+    # Tolerate a little padding before the first frame
+    end = min(len(header) - 4, position + 4096)
+    while position <= end:
+        if header[position] == 0xFF and header[position + 1] & 0xE0 == 0xE0:
+            version = (header[position + 1] >> 3) & 0b11
+            layer = (header[position + 1] >> 1) & 0b11
+            bitrate = header[position + 2] >> 4
+            sample_rate = (header[position + 2] >> 2) & 0b11
+            if version != 0b01 and layer != 0 and bitrate != MP3_BITRATE_BAD and sample_rate != MP3_SAMPLE_RATE_BAD:
+                return None, mp3_length(header, position, file_size)
+        position += 1
+    return "No MPEG audio frames found", None
+
+
+def inspect_audio_file(path):
+    """Return (why an audio file cannot be played or None, length in seconds or None).
+
+    Checks that the file exists and that its header matches a format the
+    mixer decodes, without decoding the whole file. The length is read from
+    WAVE headers and estimated for MP3 files; it is None for other formats.
+    """
+    try:
+        with open(path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+            file_size = os.fstat(f.fileno()).st_size
+    except FileNotFoundError:
+        return "Audio file not found", None
+    except OSError as e:
+        return f"Cannot read audio file: {e.strerror}", None
+    if not header:
+        return "Audio file is empty", None
+    if header[:4] == b"RIFF":
+        return check_wav(header)
+    if header[:4] in (b"OggS", b"fLaC"):
+        return None, None
+    if header[:3] == b"ID3" or (header[0] == 0xFF and header[1] & 0xE0 == 0xE0):
+        return check_mp3(header, file_size)
+    return "Unsupported audio format", None
+
+
+def check_audio_file(path):
+    """Return why an audio file cannot be played, or None if it looks playable."""
+    return inspect_audio_file(path)[0]
+
+
+def file_key(path):
+    """Size and modification time of a file, or None if it cannot be stat'ed."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def check_if_changed(path, cached):
+    """Worker task: check a file unless it matches a cached (key, error, length) result."""
+    key = file_key(path)
+    if cached is not None and key is not None and cached[0] == key:
+        return cached
+    return (key,) + inspect_audio_file(path)
+
+
+class AudioValidator(QObject):
+    """Checks the audio files of a store's reminders on a thread pool.
+
+    Files are checked when the store is loaded or reset, when reminders are
+    added or changed, and when a file system watcher reports that a file or
+    its folder changed. Results are cached by path, size and modification
+    time, so unchanged files are only stat'ed again. Audio lengths found in
+    the headers are kept with the results.
+    """
+
+    results_changed = pyqtSignal(object)
+    _checked = pyqtSignal(str, object, object, object)
+
+    def __init__(self, store, parent=None, workers=DEFAULT_VALIDATION_WORKERS):
+        super().__init__(parent)
+        self.store = store
+        self.results = {}
+        self._pending = set()
+        self._stale = set()
+        self._changed = set()
+        self._watched_folders = {}
+        self._watched_files = set()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="validate")
+        self._checked.connect(self._on_checked)
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(lambda path: self.validate([path]))
+        self.watcher.directoryChanged.connect(self._on_directory_changed)
+
+        store.reminders_reset.connect(self.validate_all)
+        store.reminder_added.connect(lambda reminder: self.validate([reminder.audio_file]))
+        store.reminder_changed.connect(lambda reminder: self.validate([reminder.audio_file]))
+
+    def error(self, path):
+        """Why a file cannot be played, or None if it is fine or not checked yet."""
+        result = self.results.get(path)
+        return result[1] if result is not None else None
+
+    def length(self, path):
+        """Length of a file in seconds, or None if it is unknown or not checked yet."""
+        result = self.results.get(path)
+        return result[2] if result is not None else None
+
+    def broken(self):
+        """Reminders whose audio file is known to be unplayable."""
+        return [reminder for reminder in self.store if self.error(reminder.audio_file) is not None]
+
+    def validate_all(self):
+        self.validate({reminder.audio_file for reminder in self.store})
+
+    def validate(self, paths):
+        for path in set(paths):
+            if path in self._pending:
+                # Check again once the running check is done
+                self._stale.add(path)
+                continue
+            self._pending.add(path)
+            future = self._executor.submit(check_if_changed, path, self.results.get(path))
+            future.add_done_callback(lambda future, path=path: self._checked.emit(path, *future.result()))
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _on_checked(self, path, key, error, length):
+        self._pending.discard(path)
+        previous = self.results.get(path)
+        self.results[path] = (key, error, length)
+        self._watch(path, key is not None)
+        if path in self._stale:
+            self._stale.discard(path)
+            self.validate([path])
+        if previous is None or previous[1:] != (error, length):
+            # Results arriving together are reported as one change
+            if not self._changed:
+                QTimer.singleShot(0, self._report_changes)
+            self._changed.add(path)
+
+    def _report_changes(self):
+        changed, self._changed = self._changed, set()
+        self.results_changed.emit(changed)
+
+    def _watch(self, path, exists):
+        # Folders are watched so files that appear or are replaced are seen
+        folder = os.path.dirname(os.path.abspath(path))
+        paths = self._watched_folders.get(folder)
+        if paths is None:
+            paths = self._watched_folders[folder] = set()
+            if os.path.isdir(folder):
+                self.watcher.addPath(folder)
+        paths.add(path)
+        if exists and path not in self._watched_files:
+            self._watched_files.add(path)
+            self.watcher.addPath(path)
+        elif not exists:
+            # The watcher drops files that were deleted
+            self._watched_files.discard(path)
+
+    def _on_directory_changed(self, folder):
+        self.validate(self._watched_folders.get(folder, ()))